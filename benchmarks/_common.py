@@ -0,0 +1,78 @@
+"""
+Shared helpers of the benchmark scripts.
+
+Each script measures a few cases and reports them through `report`, either as text or (with `--json`) as a JSON
+object on stdout, which `run.py` collects. Each case runs `rounds` rounds of `ops` operations, and its value is
+the fastest round in microseconds per operation (as `timeit` suggests, slower rounds are mostly noise from
+the rest of the system); the median is reported along.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from typing import Any, Awaitable, Callable
+
+
+def get_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--ops', type=int, default=1000)
+    return parser
+
+
+def measure(fn: Callable[[], Any], ops: int, rounds: int) -> dict:
+    fn()
+    samples = []
+    for _ in range(rounds):
+        begin = time.perf_counter()
+        for _ in range(ops):
+            fn()
+        samples.append((time.perf_counter() - begin) / ops)
+    return _to_result(samples, ops)
+
+
+def measure_async(fn: Callable[[], Awaitable[Any]], ops: int, rounds: int) -> dict:
+    async def _run():
+        await fn()
+        samples = []
+        for _ in range(rounds):
+            begin = time.perf_counter()
+            for _ in range(ops):
+                await fn()
+            samples.append((time.perf_counter() - begin) / ops)
+        return samples
+
+    return _to_result(asyncio.run(_run()), ops)
+
+
+def measure_once(fn: Callable[[], Any], rounds: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        begin = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - begin)
+    return _to_result(samples, 1)
+
+
+def _to_result(samples: list[float], ops: int) -> dict:
+    return {
+        'unit': 'us/op',
+        'value': min(samples) * 1e6,
+        'median': statistics.median(samples) * 1e6,
+        'max': max(samples) * 1e6,
+        'ops': ops,
+        'rounds': len(samples),
+    }
+
+
+def report(results: dict[str, dict], as_json: bool):
+    if as_json:
+        print(json.dumps(results))
+        return
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        print(f'{name:<{width}}  {result["value"]:>12.2f} {result["unit"]}  (median {result["median"]:.2f})')
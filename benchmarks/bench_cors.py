@@ -0,0 +1,52 @@
+"""
+Benchmark of `CorsMiddleware` overhead.
+
+The middleware alone is measured around a no-op ASGI app, against the bare app; the full stack is measured with
+a same-origin request, a cross-origin request and a preflight request.
+
+Run:
+    python benchmarks/bench_cors.py [--json]
+"""
+
+from _common import get_parser, measure_async, report
+from sprintapi import Controller, SprintApiServer, api_route, get_mapping
+from sprintapi.middleware import CorsMiddleware
+from sprintapi.utility.asgi_client import AsgiClient
+
+
+@api_route('/cors')
+class CorsController(Controller):
+    @get_mapping('ping')
+    async def ping(self):
+        return 'pong'
+
+
+async def _noop_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+def main():
+    args = get_parser('CORS middleware benchmark.').parse_args()
+
+    bare = AsgiClient(_noop_app)
+    wrapped = AsgiClient(CorsMiddleware(_noop_app, allow_origins=('https://a.example', 'https://b.example')))
+    server = AsgiClient(SprintApiServer(cors_allow_origins=('https://a.example',)).app)
+
+    origin = [('origin', 'https://a.example')]
+    preflight = [*origin, ('access-control-request-method', 'GET')]
+    cases = {
+        'noop.bare': lambda: bare.get('/'),
+        'noop.no_origin': lambda: wrapped.get('/'),
+        'noop.cross_origin': lambda: wrapped.get('/', headers=origin),
+        'noop.preflight': lambda: wrapped.request('OPTIONS', '/', headers=preflight),
+        'server.no_origin': lambda: server.get('/cors/ping'),
+        'server.cross_origin': lambda: server.get('/cors/ping', headers=origin),
+        'server.preflight': lambda: server.request('OPTIONS', '/cors/ping', headers=preflight),
+    }
+    results = {f'cors.{name}': measure_async(fn, args.ops, args.rounds) for name, fn in cases.items()}
+    report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
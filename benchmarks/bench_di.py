@@ -0,0 +1,69 @@
+"""
+Benchmark of `DependencyContainer` resolution on deep dependency graphs.
+
+The graph is `depth` levels of `width` components, each depending on every component of the previous level.
+Singletons are measured once created (the common case of controllers & services), transient components are
+created on every resolve, along with their whole transient dependency graph.
+
+Run:
+    python benchmarks/bench_di.py [--depth 20] [--width 3] [--json]
+"""
+
+from _common import get_parser, measure, measure_once, report
+from sprintapi.utility.di import DependencyContainer
+
+
+def _define_graph(depth: int, width: int) -> list[list[type]]:
+    levels = []
+    for d in range(depth):
+        level = []
+        for w in range(width):
+            deps = levels[-1] if levels else []
+            params = ', '.join(f'd{i}: {dep.__name__}' for i, dep in enumerate(deps))
+            namespace = {dep.__name__: dep for dep in deps}
+            exec(f'def __init__(self{", " if params else ""}{params}):\n    pass', namespace)
+            level.append(type(f'Component_{d}_{w}', (), {'__init__': namespace['__init__']}))
+        levels.append(level)
+    return levels
+
+
+def _build_container(levels: list[list[type]], is_singleton: bool) -> DependencyContainer:
+    container = DependencyContainer()
+    for level in levels:
+        for component in level:
+            container.register(component, component, is_singleton=is_singleton)
+    container.compile()
+    return container
+
+
+def main():
+    parser = get_parser('Dependency injection benchmark.')
+    parser.add_argument('--depth', type=int, default=20)
+    parser.add_argument('--width', type=int, default=3)
+    args = parser.parse_args()
+
+    levels = _define_graph(args.depth, args.width)
+    top = levels[-1][0]
+    all_types = [c for level in levels for c in level]
+
+    singletons = _build_container(levels, is_singleton=True)
+    singletons.resolve_with_order(all_types)
+    transients = _build_container(levels, is_singleton=False)
+
+    prefix = f'di.depth_{args.depth}_width_{args.width}'
+    results = {
+        f'{prefix}.compile': measure_once(lambda: _build_container(levels, is_singleton=True), args.rounds),
+        f'{prefix}.resolve_singleton': measure(lambda: singletons.resolve(top), args.ops, args.rounds),
+        f'{prefix}.resolve_transient': measure(lambda: transients.resolve(levels[2][0]), args.ops, args.rounds),
+        f'{prefix}.resolve_with_order': measure(
+            lambda: singletons.resolve_with_order(all_types), max(1, args.ops // 10), args.rounds
+        ),
+        f'{prefix}.resolve_with_levels': measure(
+            lambda: singletons.resolve_with_levels(all_types), max(1, args.ops // 10), args.rounds
+        ),
+    }
+    report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark of error handling throughput.
+
+Covers a SprintAPI error with its default message (pre-rendered body), with a custom message, a request
+validation error, and the same routes succeeding for reference.
+
+Run:
+    python benchmarks/bench_errors.py [--json]
+"""
+
+from _common import get_parser, measure_async, report
+from sprintapi import Controller, NotFoundError, SprintApiServer, api_route, get_mapping
+from sprintapi.utility.asgi_client import AsgiClient
+
+
+@api_route('/errors')
+class ErrorController(Controller):
+    @get_mapping('ok')
+    async def ok(self, value: int = 0):
+        return value
+
+    @get_mapping('default')
+    async def default_error(self):
+        raise NotFoundError()
+
+    @get_mapping('custom')
+    async def custom_error(self):
+        raise NotFoundError('Item 42 does not exist.')
+
+
+def main():
+    args = get_parser('Error handling benchmark.').parse_args()
+    client = AsgiClient(SprintApiServer().app)
+
+    sse = [('accept', 'text/event-stream')]
+    cases = {
+        'ok': lambda: client.get('/errors/ok', query_string='value=1'),
+        'default_message': lambda: client.get('/errors/default'),
+        'custom_message': lambda: client.get('/errors/custom'),
+        'event_stream': lambda: client.get('/errors/default', headers=sse),
+        'validation': lambda: client.get('/errors/ok', query_string='value=x'),
+    }
+    results = {f'errors.{name}': measure_async(fn, args.ops, args.rounds) for name, fn in cases.items()}
+    report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark of route dispatch through `Controller.get_router`, with a given number of controllers.
+
+Each controller has a static GET, a parameterized GET and a POST mapping. Requests hit the routes of the first
+and of the last controller (Starlette's own router matches routes in order, see `--no-compile`), and a path that
+matches no route.
+
+Run:
+    python benchmarks/bench_routing.py [--controllers 10] [--no-compile] [--json]
+"""
+
+from _common import get_parser, measure_async, report
+from sprintapi import Controller, SprintApiServer, api_route, get_mapping, post_mapping
+from sprintapi.utility.asgi_client import AsgiClient
+
+
+def _define_controller(index: int):
+    class _Controller(Controller):
+        @get_mapping('items')
+        async def list_items(self):
+            return []
+
+        @get_mapping('items/{item_id}')
+        async def get_item(self, item_id: int):
+            return {'id': item_id}
+
+        @post_mapping('items')
+        async def create_item(self):
+            return None
+
+    _Controller.__name__ = _Controller.__qualname__ = f'Controller{index}'
+    api_route(f'/c{index}')(_Controller)
+
+
+def main():
+    parser = get_parser('Route dispatch benchmark.')
+    parser.add_argument('--controllers', type=int, default=10)
+    parser.add_argument('--no-compile', action='store_true', help='dispatch through the Starlette router')
+    args = parser.parse_args()
+
+    for i in range(args.controllers):
+        _define_controller(i)
+    client = AsgiClient(SprintApiServer(compile_routes=not args.no_compile).app)
+
+    last = args.controllers - 1
+    cases = {
+        'first_static': lambda: client.get('/c0/items'),
+        'first_param': lambda: client.get('/c0/items/42'),
+        'last_static': lambda: client.get(f'/c{last}/items'),
+        'last_param': lambda: client.get(f'/c{last}/items/42'),
+        'last_post': lambda: client.post(f'/c{last}/items'),
+        'not_found': lambda: client.get('/missing'),
+    }
+    results = {
+        f'routing.controllers_{args.controllers}.{name}': measure_async(fn, args.ops, args.rounds)
+        for name, fn in cases.items()
+    }
+    report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark of controller response serialization, default path vs. `fast_json`.
+
+Both controllers return the same list of Pydantic models, with and without a response model (the latter
+goes through `jsonable_encoder` by default). Requests are driven through the ASGI app of `SprintApiServer`
+in-process, so the result reflects framework overhead without any socket I/O.
+
+Run:
+    python benchmarks/bench_serialization.py [--items 1000] [--json]
+"""
+
+from datetime import datetime
+from pydantic import BaseModel
+
+from _common import get_parser, measure_async, report
+from sprintapi import SprintApiServer, api_route, get_mapping, Controller
+from sprintapi.utility.asgi_client import AsgiClient
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    price: float
+    tags: list[str]
+    created_at: datetime
+
+
+_items: list[Item] = []
+
+
+@api_route('/default')
+class DefaultController(Controller):
+    @get_mapping('items')
+    async def get_items(self) -> list[Item]:
+        return _items
+
+    @get_mapping('untyped-items')
+    async def get_untyped_items(self):
+        return _items
+
+
+@api_route('/fast', fast_json=True)
+class FastController(Controller):
+    @get_mapping('items')
+    async def get_items(self) -> list[Item]:
+        return _items
+
+    @get_mapping('untyped-items')
+    async def get_untyped_items(self):
+        return _items
+
+
+def main():
+    parser = get_parser('Response serialization benchmark.')
+    parser.add_argument('--items', type=int, default=1000)
+    parser.set_defaults(ops=100)
+    args = parser.parse_args()
+
+    _items.extend(
+        Item(id=i, name=f'item-{i}', price=i * 1.5, tags=['a', 'b'], created_at=datetime(2024, 1, 1))
+        for i in range(args.items)
+    )
+    client = AsgiClient(SprintApiServer().app)
+
+    results = {}
+    for path in ('items', 'untyped-items'):
+        for mode in ('default', 'fast'):
+            name = f'serialization.items_{args.items}.{path.replace("-", "_")}.{mode}'
+            results[name] = measure_async(lambda: client.get(f'/{mode}/{path}'), args.ops, args.rounds)
+    report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark of startup time: `SprintApiServer` construction (DI registration & compilation, controller binding)
+and the service init/start phases, with a given number of controllers and services.
+
+Run:
+    python benchmarks/bench_startup.py [--controllers 50] [--services 50] [--json]
+"""
+
+import asyncio
+
+from _common import get_parser, measure_once, report
+from sprintapi import Controller, Service, SprintApiServer, api_route, get_mapping, service
+
+
+def _define_controller(index: int):
+    class _Controller(Controller):
+        @get_mapping('items')
+        async def list_items(self):
+            return []
+
+        @get_mapping('items/{item_id}')
+        async def get_item(self, item_id: int):
+            return {'id': item_id}
+
+    _Controller.__name__ = _Controller.__qualname__ = f'Controller{index}'
+    api_route(f'/c{index}')(_Controller)
+
+
+def _define_service(index: int, previous: list[type]):
+    # each service depends on the previous one, so that init/start run level by level
+    namespace = {p.__name__: p for p in previous[-1:]}
+    params = ''.join(f', dep: {p.__name__}' for p in previous[-1:])
+    exec(f'def __init__(self{params}):\n    pass', namespace)
+    s = type(f'Service{index}', (Service,), {'__init__': namespace['__init__']})
+    service(s)
+    previous.append(s)
+
+
+def main():
+    parser = get_parser('Startup benchmark.')
+    parser.add_argument('--controllers', type=int, default=50)
+    parser.add_argument('--services', type=int, default=50)
+    args = parser.parse_args()
+
+    for i in range(args.controllers):
+        _define_controller(i)
+    services = []
+    for i in range(args.services):
+        _define_service(i, services)
+
+    prefix = f'startup.controllers_{args.controllers}_services_{args.services}'
+    construct = measure_once(SprintApiServer, args.rounds)
+    server = SprintApiServer()
+    results = {
+        f'{prefix}.construct': construct,
+        f'{prefix}.service_startup': measure_once(lambda: asyncio.run(server._pre_startup()), args.rounds),
+    }
+    report(results, args.json)
+
+
+if __name__ == '__main__':
+    main()
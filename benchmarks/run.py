@@ -0,0 +1,111 @@
+"""
+Run the benchmark suite, and optionally compare the results with a baseline.
+
+Each benchmark case runs in its own process, since controllers & services are registered globally by their
+decorators. Results are written as JSON (`--output`), which can later be passed as `--baseline`; a case
+slower than its baseline by more than `--threshold` (a ratio, 0.1 is 10%) is reported as a regression,
+and the exit code is then 1.
+
+Run:
+    python benchmarks/run.py [--output results.json] [--baseline baseline.json] [--threshold 0.1]
+                             [--filter routing] [--quick]
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+import time
+
+
+_BENCHMARK_DIR = pathlib.Path(__file__).resolve().parent
+
+# (script, args)
+_CASES = [
+    ('bench_routing.py', ['--controllers', '10']),
+    ('bench_routing.py', ['--controllers', '200']),
+    ('bench_cors.py', []),
+    ('bench_di.py', ['--depth', '5', '--width', '2']),
+    ('bench_di.py', ['--depth', '50', '--width', '3']),
+    ('bench_errors.py', []),
+    ('bench_serialization.py', []),
+    ('bench_startup.py', ['--controllers', '10', '--services', '10']),
+    ('bench_startup.py', ['--controllers', '200', '--services', '100']),
+]
+
+
+def _run_case(script: str, args: list[str], quick: bool) -> dict[str, dict]:
+    command = [sys.executable, str(_BENCHMARK_DIR / script), '--json', *args]
+    if quick:
+        command += ['--rounds', '3', '--ops', '100']
+
+    env = dict(os.environ)
+    src_dir = _BENCHMARK_DIR.parent / 'src'
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (str(src_dir), env.get('PYTHONPATH', '')) if p)
+
+    completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f'{script} {" ".join(args)} failed:\n{completed.stderr}')
+    # logs go to stdout as well, results are on the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float) -> list[str]:
+    regressions = []
+    print(f'\n{"case":<64} {"baseline":>12} {"current":>12} {"change":>8}')
+    for name, result in results.items():
+        base = baseline.get(name, None)
+        if base is None:
+            print(f'{name:<64} {"-":>12} {result["value"]:>12.2f} {"new":>8}')
+            continue
+        ratio = result['value'] / base['value'] - 1
+        mark = ''
+        if ratio > threshold:
+            mark = '  REGRESSION'
+            regressions.append(name)
+        print(f'{name:<64} {base["value"]:>12.2f} {result["value"]:>12.2f} {ratio:>+8.1%}{mark}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SprintAPI benchmark suite.')
+    parser.add_argument('--output', type=pathlib.Path, default=None, help='write results to this JSON file')
+    parser.add_argument('--baseline', type=pathlib.Path, default=None, help='compare with this results file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='regression threshold, as a ratio')
+    parser.add_argument('--filter', default=None, help='only run scripts whose name contains this')
+    parser.add_argument('--quick', action='store_true', help='fewer rounds & operations')
+    args = parser.parse_args()
+
+    results: dict[str, dict] = {}
+    for script, case_args in _CASES:
+        if args.filter and args.filter not in script:
+            continue
+        begin = time.perf_counter()
+        case_results = _run_case(script, case_args, args.quick)
+        print(f'{script} {" ".join(case_args)}: {len(case_results)} cases in {time.perf_counter() - begin:.1f} s')
+        for name, result in case_results.items():
+            print(f'  {name:<62} {result["value"]:>12.2f} {result["unit"]}')
+        results.update(case_results)
+
+    if args.output is not None:
+        doc = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': results,
+        }
+        args.output.write_text(json.dumps(doc, indent=2))
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())['results']
+        regressions = _compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regressions over {args.threshold:.0%}.')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
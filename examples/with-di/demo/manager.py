@@ -27,6 +27,7 @@ class AppManager(Service):
     are done in different async loops, which is a typical pitfall in FastAPI.
 
     Services are init and started in TOPOLOGICAL ORDER (in dependency graph), and stopped in reverse order.
+    Services without dependencies between each other are handled concurrently.
     """
 
     # The constructor takes the `DemoConfig` as a parameter, which will be injected by the framework.
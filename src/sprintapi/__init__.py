@@ -1,3 +1,4 @@
+from .component import component
 from .config import Configuration, configuration
 from .controller import (
     Controller,
@@ -5,7 +6,9 @@ from .controller import (
     get_mapping,
     post_mapping,
     put_mapping,
-    delete_mapping
+    delete_mapping,
+    sse_mapping,
+    websocket_mapping
 )
 from .error import *
 from .server import *
@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import time
+
+import fastapi
+
+from collections import OrderedDict
+from typing import Iterable, Optional, Union
+
+from .routing import RouteHandler, SprintApiRoute
+
+
+__all__ = [
+    'ResponseCache',
+    'ResponseCacheManager',
+]
+
+
+class _CacheEntry:
+    __slots__ = ('path', 'expires_at', 'status_code', 'raw_headers', 'body', 'etag')
+
+    def __init__(self, path: str, expires_at: float, response: fastapi.Response, etag: bytes):
+        self.path = path
+        self.expires_at = expires_at
+        self.status_code = response.status_code
+        self.raw_headers = response.raw_headers
+        self.body = response.body
+        self.etag = etag
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of serialized responses with TTL, set as the `cache` option of GET mappings.
+
+    Entries are keyed by path, query string and the values of `vary_headers`. Only successful (200),
+    non-streaming responses without cookies are cached. A strong ETag is added, so that a request with
+    a matching `If-None-Match` gets a 304. Concurrent misses of the same key run the handler only once, unless
+    its response is not cacheable, then the waiting requests all run it at once.
+
+    Caches are registered to `ResponseCacheManager` by `name` (the route path by default), through which
+    services can invalidate entries.
+    """
+
+    def __init__(
+            self,
+            ttl: float = 5,
+            max_entries: int = 1024,
+            vary_headers: Iterable[str] = (),
+            name: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.vary_headers = tuple(h.lower() for h in vary_headers)
+        self.name = name
+
+        self._entries: OrderedDict[tuple, _CacheEntry] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+
+    def invalidate(self, path: Optional[str] = None):
+        """
+        Invalidate all entries, or only entries of the given request path.
+        """
+        if path is None:
+            self._entries.clear()
+            return
+        for key in [k for k, e in self._entries.items() if e.path == path]:
+            del self._entries[key]
+
+    def wrap(self, handler: RouteHandler) -> RouteHandler:
+        inflight = self._inflight
+        vary_headers = self.vary_headers
+
+        async def _handler(request: fastapi.Request):
+            if request.method not in ('GET', 'HEAD'):
+                return await handler(request)
+
+            headers = request.headers
+            key = (
+                request.url.path,
+                request.scope['query_string'],
+                *(headers.get(h) for h in vary_headers)
+            )
+
+            entry = self._get(key)
+            future = None
+            if entry is None:
+                future = inflight.get(key, None)
+                if future is not None:
+                    # another request is running the handler for the same key
+                    entry = await asyncio.shield(future)
+
+            if entry is None:
+                # either leading, or the leader's response is not cacheable, then all waiters run the handler at once
+                leading = future is None
+                if leading:
+                    future = inflight[key] = asyncio.get_running_loop().create_future()
+                try:
+                    response = await handler(request)
+                    entry = self._put(key, request.url.path, response)
+                finally:
+                    if leading:
+                        if inflight.get(key, None) is future:
+                            del inflight[key]
+                        future.set_result(entry)
+
+                if entry is None:
+                    return response
+
+            return _render(entry, headers.get('if-none-match'))
+
+        return _handler
+
+    def _get(self, key: tuple) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _put(self, key: tuple, path: str, response: fastapi.Response) -> Optional[_CacheEntry]:
+        body = getattr(response, 'body', None)
+        if response.status_code != 200 or not isinstance(body, bytes) or 'set-cookie' in response.headers:
+            return None
+
+        etag = b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode('ascii') + b'"'
+        response.raw_headers.append((b'etag', etag))
+
+        entry = self._entries[key] = _CacheEntry(path, time.monotonic() + self.ttl, response, etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+
+class ResponseCacheManager:
+    """
+    Registry of response caches used by routes, injectable into services for programmatic invalidation.
+    """
+
+    def __init__(self):
+        self._caches: dict[str, list[ResponseCache]] = {}
+
+    def get_cache_names(self) -> list[str]:
+        return list(self._caches)
+
+    def invalidate(self, name: str, path: Optional[str] = None):
+        for cache in self._caches.get(name, ()):
+            cache.invalidate(path)
+
+    def invalidate_all(self):
+        for caches in self._caches.values():
+            for cache in caches:
+                cache.invalidate()
+
+    def route_wrapper(self, route: SprintApiRoute, handler: RouteHandler) -> RouteHandler:
+        cache: Union[ResponseCache, float, bool, None] = route.options.get('cache', None)
+        if cache is None or cache is False:
+            return handler
+
+        if not isinstance(cache, ResponseCache):
+            cache = ResponseCache() if cache is True else ResponseCache(ttl=cache)
+
+        name = cache.name or route.path
+        caches = self._caches.setdefault(name, [])
+        if cache not in caches:
+            caches.append(cache)
+
+        return cache.wrap(handler)
+
+
+def _render(entry: _CacheEntry, if_none_match: Optional[str]) -> fastapi.Response:
+    if if_none_match is not None and _etag_matches(entry.etag, if_none_match):
+        response = fastapi.Response(status_code=304)
+        response.raw_headers = [(b'etag', entry.etag)]
+        return response
+
+    response = fastapi.Response(status_code=entry.status_code)
+    response.body = entry.body
+    response.raw_headers = list(entry.raw_headers)
+    return response
+
+
+def _etag_matches(etag: bytes, if_none_match: str) -> bool:
+    if if_none_match.strip() == '*':
+        return True
+    tag = etag.decode('ascii')
+    return any(t.strip().removeprefix('W/') == tag for t in if_none_match.split(','))
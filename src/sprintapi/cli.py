@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import pathlib
+import signal
+import socket
+import sys
+import time
+
+from typing import Optional, Sequence
+
+from .loadgen import HttpClient, LoadGenerator, Target, asgi_sender, compare_reports, format_report
+from .routing import SprintApiRoute
+from .server import SprintApiServer
+from .utility.asgi_client import AsgiClient
+
+
+__all__ = ['main']
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(prog='sprintapi')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    bench = commands.add_parser(
+        'bench',
+        help='load test an app',
+        description='Import the app modules (which register controllers, services...), build a SprintApiServer, '
+                    'and load test it through ASGI or over loopback HTTP.'
+    )
+    bench.add_argument('modules', nargs='*', help='modules to import, e.g. demo.controller')
+    bench.add_argument('--server', default=None,
+                       help='module:attribute of a SprintApiServer (or a callable returning one), '
+                            'a default SprintApiServer is built otherwise')
+    bench.add_argument('-r', '--route', dest='routes', action='append', default=[],
+                       help='[METHOD ]path[?query], repeatable; defaults to all GET mappings without path parameters')
+    bench.add_argument('-H', '--header', dest='headers', action='append', default=[], help='"Name: value", repeatable')
+    bench.add_argument('--body', default='', help='request body of routes other than GET and HEAD')
+    bench.add_argument('-d', '--duration', type=float, default=10, help='measured seconds')
+    bench.add_argument('--warmup', type=float, default=1, help='seconds before measuring')
+    bench.add_argument('-c', '--concurrency', type=int, default=16,
+                       help='closed-loop workers, or max in-flight requests in open-loop mode')
+    bench.add_argument('--rate', type=float, default=None,
+                       help='requests per second, runs in open-loop mode with coordinated omission correction')
+    bench.add_argument('--transport', choices=('asgi', 'http'), default='asgi')
+    bench.add_argument('--port', type=int, default=0, help='loopback port of http transport, a free one by default')
+    bench.add_argument('--output', type=pathlib.Path, default=None, help='write the report to this JSON file')
+    bench.add_argument('--compare', type=pathlib.Path, default=None, help='compare with a previous JSON report')
+
+    args = parser.parse_args(argv)
+    if args.command == 'bench':
+        sys.exit(_bench(args))
+
+
+def _bench(args: argparse.Namespace) -> int:
+    # same as running a script of the app from its directory
+    sys.path.insert(0, os.getcwd())
+    for module in args.modules:
+        importlib.import_module(module)
+    server = _get_server(args.server)
+
+    headers = []
+    for header in args.headers:
+        name, sep, value = header.partition(':')
+        if not sep:
+            print(f'Invalid header "{header}".', file=sys.stderr)
+            return 2
+        headers.append((name.strip(), value.strip()))
+    body = args.body.encode('utf-8')
+
+    specs = args.routes or _get_default_routes(server)
+    if not specs:
+        print('No route to load test, specify them with --route.', file=sys.stderr)
+        return 2
+    targets = [Target.parse(spec, headers) for spec in specs]
+    for target in targets:
+        if target.method not in ('GET', 'HEAD'):
+            target.body = body
+    generator_args = dict(
+        targets=targets,
+        duration=args.duration,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        rate=args.rate,
+    )
+
+    if args.transport == 'asgi':
+        report = asyncio.run(_bench_asgi(server, generator_args))
+    else:
+        report = _bench_http(server, args.port or _get_free_port(), generator_args)
+    report['transport'] = args.transport
+
+    print(format_report(report))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.compare is not None:
+        print()
+        print(compare_reports(json.loads(args.compare.read_text()), report))
+    return 0
+
+
+def _get_server(spec: Optional[str]) -> SprintApiServer:
+    if spec is None:
+        return SprintApiServer()
+
+    module, _, attribute = spec.partition(':')
+    server = getattr(importlib.import_module(module), attribute or 'server')
+    if not isinstance(server, SprintApiServer) and callable(server):
+        server = server()
+    if not isinstance(server, SprintApiServer):
+        raise TypeError(f'{spec} is not a SprintApiServer.')
+    return server
+
+
+def _get_default_routes(server: SprintApiServer) -> list[str]:
+    return [
+        f'GET {route.path}'
+        for route in server.app.routes
+        if isinstance(route, SprintApiRoute)
+        and 'GET' in route.methods
+        and '{' not in route.path
+        and not route.options.get('sse', None)
+    ]
+
+
+def _get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def _bench_asgi(server: SprintApiServer, generator_args: dict) -> dict:
+    await server._pre_startup()
+    try:
+        client = AsgiClient(server.app)
+        return await LoadGenerator(asgi_sender(client), **generator_args).run()
+    finally:
+        await server._pre_shutdown()
+        await server._post_shutdown()
+
+
+def _bench_http(server: SprintApiServer, port: int, generator_args: dict) -> dict:
+    if not hasattr(os, 'fork'):
+        raise RuntimeError('HTTP transport requires os.fork().')
+
+    server.config.host = '127.0.0.1'
+    server.config.port = port
+    server.config.access_log = False
+
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 0
+        try:
+            server.run()
+        except BaseException:
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    try:
+        _wait_port(port, timeout=30)
+        return asyncio.run(_run_http(port, generator_args))
+    finally:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+
+
+async def _run_http(port: int, generator_args: dict) -> dict:
+    client = HttpClient('127.0.0.1', port, generator_args['concurrency'])
+    try:
+        return await LoadGenerator(client.send, **generator_args).run()
+    finally:
+        await client.close()
+
+
+def _wait_port(port: int, timeout: float):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Server is not listening on port {port} after {timeout} seconds.')
+            time.sleep(0.05)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import inspect
+
+
+__all__ = [
+    'component',
+    'get_component_types',
+]
+
+
+_component_types: dict[type, tuple[str, int]] = {}
+
+
+def component(target=None, /, scope: str = 'singleton', pool_size: int = 0):
+    """
+    Register a plain component into the dependency container.
+
+    Can be used either as `@component` or `@component(scope='request', pool_size=16)`.
+    """
+    def _inner(t):
+        if inspect.isfunction(t):
+            return t
+
+        if not isinstance(t, type):
+            raise TypeError(f'{t} is not a type.')
+        if t in _component_types:
+            raise ValueError(f'Component class "{t.__name__}" is already registered.')
+
+        _component_types[t] = (scope, pool_size)
+        return t
+
+    if target is None:
+        return _inner
+    return _inner(target)
+
+
+def get_component_types() -> dict[type, tuple[str, int]]:
+    return _component_types.copy()
@@ -0,0 +1,93 @@
+import abc
+import zlib
+
+import fastapi
+
+from typing import Optional
+
+from .routing import RouteHandler, SprintApiRoute
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+__all__ = [
+    'BrotliEncoder',
+    'COMPRESS_SCOPE_KEY',
+    'Encoder',
+    'GzipEncoder',
+    'compression_route_wrapper',
+    'disable_compression',
+    'is_brotli_available',
+]
+
+
+# set to False in the ASGI scope to make the compression middleware skip the response
+COMPRESS_SCOPE_KEY = 'sprintapi.compress'
+
+
+class Encoder(abc.ABC):
+    """
+    Incremental encoder of a response body, each chunk is flushed so that streamed chunks reach the client.
+    """
+    name: bytes = b''
+
+    @abc.abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass
+
+    @abc.abstractmethod
+    def finish(self, data: bytes) -> bytes:
+        pass
+
+
+class GzipEncoder(Encoder):
+    name = b'gzip'
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder(Encoder):
+    name = b'br'
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def is_brotli_available() -> bool:
+    return brotli is not None
+
+
+def disable_compression(request: fastapi.Request):
+    """
+    Make the compression middleware skip the response of the request.
+    """
+    request.scope[COMPRESS_SCOPE_KEY] = False
+
+
+def compression_route_wrapper(route: SprintApiRoute, handler: RouteHandler) -> RouteHandler:
+    compress: Optional[bool] = route.options.get('compress', None)
+    if compress is None or compress:
+        return handler
+
+    async def _handler(request: fastapi.Request):
+        # the scope is shared with the middleware, which reads the flag when the response starts
+        request.scope[COMPRESS_SCOPE_KEY] = False
+        return await handler(request)
+
+    return _handler
@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import fastapi
+
+from collections import deque
+from typing import Optional
+
+from .error import DeadlineExceededError, UnavailableError
+from .routing import RouteHandler, SprintApiRoute
+
+
+__all__ = [
+    'ConcurrencyLimit',
+    'LoadShedError',
+    'concurrency_route_wrapper',
+]
+
+
+class LoadShedError(UnavailableError):
+    """
+    Raised when a request is shed by a `ConcurrencyLimit`.
+    """
+
+    def __init__(self, message: str = 'Server is overloaded.'):
+        super().__init__(message)
+
+
+class ConcurrencyLimit:
+    """
+    Adaptive (AIMD) concurrency limiter.
+
+    The limit grows additively (by `1 / limit` per fast completion, only while it is actually reached), and
+    shrinks multiplicatively by `backoff` when a request is slower than `target_latency` (by default,
+    `tolerance` times the recent minimal latency) or exceeds its deadline; at most once per observed latency,
+    so that a burst of slow requests doesn't collapse the limit.
+
+    Once the limit is reached, requests wait in a queue of at most `max_queue` for `queue_timeout` seconds,
+    and are shed with `LoadShedError` otherwise. Requests shed by an inner limiter (e.g. a per-route one under
+    the global one) are not taken as overload.
+    """
+
+    def __init__(
+            self,
+            initial_limit: int = 20,
+            min_limit: int = 1,
+            max_limit: int = 1000,
+            target_latency: Optional[float] = None,
+            tolerance: float = 2.0,
+            backoff: float = 0.9,
+            max_queue: int = 100,
+            queue_timeout: float = 0.05,
+            window: int = 100,
+            name: Optional[str] = None,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.shed = 0
+
+        self._waiters: deque[asyncio.Future] = deque()
+        self._window = window
+        self._window_count = 0
+        self._window_min = float('inf')
+        self._min_latency = float('inf')
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for w in self._waiters if not w.done())
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            'limit': self.limit,
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'shed': self.shed,
+        }
+
+    async def acquire(self):
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if len(self._waiters) >= self.max_queue or self.queue_timeout <= 0:
+            self.shed += 1
+            raise LoadShedError()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # the slot is handed over by `release`, when the waiter is woken up
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return
+            self.shed += 1
+            raise LoadShedError()
+        except BaseException:
+            # cancelled right after the slot is handed over
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self, latency: float, overloaded: bool = False):
+        self._update_limit(latency, overloaded)
+        self._release_slot()
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self.in_flight += 1
+
+    def wrap(self, handler: RouteHandler) -> RouteHandler:
+        async def _handler(request: fastapi.Request):
+            await self.acquire()
+            begin = time.perf_counter()
+            try:
+                response = await handler(request)
+            except LoadShedError:
+                # shed right away by an inner limiter, which says nothing about the latency here
+                self._release_slot()
+                raise
+            except DeadlineExceededError:
+                self.release(time.perf_counter() - begin, overloaded=True)
+                raise
+            except BaseException:
+                self.release(time.perf_counter() - begin)
+                raise
+            self.release(time.perf_counter() - begin)
+            return response
+
+        return _handler
+
+    def _update_limit(self, latency: float, overloaded: bool):
+        # windowed minimal latency, as the no-load baseline
+        self._window_min = min(self._window_min, latency)
+        self._window_count += 1
+        if self._window_count >= self._window:
+            self._min_latency = self._window_min
+            self._window_min = float('inf')
+            self._window_count = 0
+        baseline = min(self._min_latency, self._window_min)
+
+        threshold = self.target_latency if self.target_latency is not None else baseline * self.tolerance
+        if overloaded or latency > threshold:
+            now = time.monotonic()
+            if now - self._last_decrease >= latency:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = now
+        elif self.in_flight + 1 > self.limit:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+
+def concurrency_route_wrapper(route: SprintApiRoute, handler: RouteHandler) -> RouteHandler:
+    limit: Optional[ConcurrencyLimit] = route.options.get('concurrency_limit', None)
+    if limit is None:
+        return handler
+    if limit.name is None:
+        limit.name = route.path
+    return limit.wrap(handler)
@@ -1,36 +1,228 @@
+import asyncio
+import json
 import os
+import pathlib
+import signal
 
-from pydantic import BaseModel
-from typing import Any, Mapping
+from pydantic import BaseModel, ValidationError
+from typing import Any, Iterable, Mapping, Optional, Union
 
+from .logging import get_sprintapi_logger
+from .utility.di import DependencyContainer
 from .utility.type_registry import get_registry_decorator
 
 
 __all__ = [
+    'ConfigReloader',
     'Configuration',
     'configuration',
+    'get_config_file',
     'get_configuration_types',
+    'read_config_source',
+    'set_config_file',
 ]
 
 
+_logger = get_sprintapi_logger('Configuration')
+
+
 class Configuration(BaseModel):
     @classmethod
     def load(cls):
-        config_dict = cls._get_required_dict(os.environ)
+        """
+        Load from the environment, overridden by the config file if set.
+        """
+        return cls.load_from(read_config_source())
+
+    @classmethod
+    def load_from(cls, source: Mapping[str, Any]):
+        config_dict = cls._get_required_dict(source)
         return cls.model_validate(config_dict, by_alias=True)
 
     @classmethod
     def _get_required_dict(cls, d: Mapping[str, Any]):
         res = {}
-        for key in cls.model_json_schema()['properties']:
+        for key in _get_aliases(cls):
             if key in d:
                 res[key] = d[key]
         return res
 
 
+_aliases: dict[type[Configuration], tuple[str, ...]] = {}
+
+
+def _get_aliases(config_type: type[Configuration]) -> tuple[str, ...]:
+    aliases = _aliases.get(config_type, None)
+    if aliases is None:
+        aliases = _aliases[config_type] = tuple(f.alias or name for name, f in config_type.model_fields.items())
+    return aliases
+
+
 _config_types: set[type[Configuration]] = set()
 configuration = get_registry_decorator(Configuration, _config_types)
 
 
 def get_configuration_types() -> set[type[Configuration]]:
     return _config_types.copy()
+
+
+# Config file
+
+
+_config_file: Optional[pathlib.Path] = None
+
+
+def set_config_file(path: Union[str, os.PathLike, None]):
+    """
+    Set the config file read along with the environment, whose values take precedence.
+
+    A `.json` file holds an object of config keys, any other file is read as dotenv (`KEY=VALUE` lines).
+    """
+    global _config_file
+    _config_file = pathlib.Path(path) if path is not None else None
+
+
+def get_config_file() -> Optional[pathlib.Path]:
+    return _config_file
+
+
+def read_config_source() -> dict[str, Any]:
+    source: dict[str, Any] = dict(os.environ)
+    if _config_file is not None:
+        source.update(_read_config_file(_config_file))
+    return source
+
+
+def _read_config_file(path: pathlib.Path) -> dict[str, Any]:
+    text = path.read_text(encoding='utf-8')
+    if path.suffix == '.json':
+        values = json.loads(text)
+        if not isinstance(values, dict):
+            raise ValueError(f'Config file "{path}" is not a JSON object.')
+        return values
+
+    values = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        line = line.removeprefix('export ')
+        key, sep, value = line.partition('=')
+        if not sep:
+            raise ValueError(f'Invalid line in config file "{path}": {line}')
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        values[key.strip()] = value
+    return values
+
+
+# Reload
+
+
+class ConfigReloader:
+    """
+    Reloads configuration singletons of a container on `SIGHUP`, or when the config file is modified.
+
+    All configurations are revalidated first, and nothing is changed if any of them fails. Then each changed
+    configuration instance is updated in place (so that all holders see the new values at once), and
+    the `async on_config_changed(config)` callback is called on components depending directly on it,
+    for those defining it.
+    """
+
+    def __init__(
+            self,
+            container: DependencyContainer,
+            config_types: Iterable[type[Configuration]],
+            watch_interval: Optional[float] = 2,
+    ):
+        self._container = container
+        self._config_types = list(config_types)
+        self._watch_interval = watch_interval
+        self._watch_task: Optional[asyncio.Task] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        self._sighup_installed = False
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        if hasattr(signal, 'SIGHUP'):
+            try:
+                loop.add_signal_handler(signal.SIGHUP, self._schedule_reload)
+                self._sighup_installed = True
+            except (NotImplementedError, RuntimeError):
+                _logger.warning('Failed to install SIGHUP handler, reload on SIGHUP is disabled.')
+        if _config_file is not None and self._watch_interval:
+            self._watch_task = asyncio.create_task(self._watch(_config_file, _stat(_config_file)))
+
+    async def stop(self):
+        if self._sighup_installed:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+            self._sighup_installed = False
+        for task in (self._watch_task, self._reload_task):
+            if task is not None:
+                task.cancel()
+        self._watch_task = None
+
+    async def reload(self) -> list[type[Configuration]]:
+        """
+        Reload all configurations, and return the changed ones.
+        """
+        try:
+            source = read_config_source()
+        except (OSError, ValueError) as e:
+            _logger.error(f'Failed to read config file: {e!r}')
+            return []
+
+        updates = []
+        for config_type in self._config_types:
+            instance = self._container.get_instance(config_type)
+            if instance is None:
+                continue
+            try:
+                new = config_type.load_from(source)
+            except ValidationError as e:
+                _logger.error(f'Configuration {config_type.__name__} is invalid, nothing reloaded: {e}')
+                return []
+            if new != instance:
+                updates.append((config_type, instance, new))
+
+        # no await in between, all instances are swapped at once
+        for _, instance, new in updates:
+            instance.__dict__.update(new.__dict__)
+            object.__setattr__(instance, '__pydantic_fields_set__', new.__pydantic_fields_set__)
+
+        changed = [config_type for config_type, _, _ in updates]
+        for config_type, instance, _ in updates:
+            _logger.info(f'Configuration {config_type.__name__} reloaded.')
+            for dependent in self._container.get_dependents(config_type):
+                await self._notify(dependent, instance)
+        return changed
+
+    async def _notify(self, dependent: type, config: Configuration):
+        callback = getattr(self._container.get_instance(dependent), 'on_config_changed', None)
+        if callback is None:
+            return
+        try:
+            await callback(config)
+        except Exception:
+            _logger.exception(f'{dependent.__name__}.on_config_changed failed.')
+
+    def _schedule_reload(self):
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.create_task(self.reload())
+
+    async def _watch(self, path: pathlib.Path, last: Optional[tuple[int, int]]):
+        while True:
+            await asyncio.sleep(self._watch_interval)
+            current = _stat(path)
+            if current != last:
+                last = current
+                await self.reload()
+
+
+def _stat(path: pathlib.Path) -> Optional[tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
@@ -1,6 +1,16 @@
 import fastapi
+import functools
 import inspect
 
+from fastapi.exceptions import ResponseValidationError
+from pydantic import TypeAdapter, ValidationError
+from typing import Annotated, Optional, get_type_hints
+
+from .response import FastJsonResponse
+from .routing import SprintApiRoute
+from .sse import EventStreamResponse
+from .utility.di import DependencyContainer
+
 
 __all__ = [
     'api_route',
@@ -10,24 +20,47 @@ __all__ = [
     'get_mapping',
     'post_mapping',
     'put_mapping',
-    'delete_mapping'
+    'delete_mapping',
+    'sse_mapping',
+    'websocket_mapping'
 ]
 
 
 # APIs
 
 
+# SprintAPI route options, which are consumed by `SprintApiRoute` wrappers instead of FastAPI
+_ROUTE_OPTION_KEYS = frozenset({
+    'cache',
+    'compress',
+    'concurrency_limit',
+    'fast_json',
+    'rate_limit',
+    'sse',
+    'timeout',
+})
+
+
+def _split_route_options(kwargs: dict) -> tuple[dict, dict]:
+    args = {k: v for k, v in kwargs.items() if k not in _ROUTE_OPTION_KEYS}
+    options = {k: v for k, v in kwargs.items() if k in _ROUTE_OPTION_KEYS}
+    return args, options
+
+
 def _method_mapping(method: str, route: str, **kwargs):
     if not route.startswith('/') and len(route) > 0:
         route = '/' + route
 
+    args, options = _split_route_options(kwargs)
+
     def _inner(target):
         if not inspect.isfunction(target):
             return target
 
         target._sprint_api_type = method
         target._sprint_api_route = route
-        target._sprint_api_args = kwargs
+        target._sprint_api_args = args
+        target._sprint_api_options = options
 
         return target
 
@@ -58,15 +91,45 @@ def delete_mapping(route: str, **kwargs):
     return _method_mapping('DELETE', route, **kwargs)
 
 
+def sse_mapping(
+        route: str,
+        heartbeat: Optional[float] = 15,
+        coalesce_window: float = 0.01,
+        max_pending: int = 64,
+        **kwargs
+):
+    """
+    GET mapping of an async generator, whose items are streamed as server-sent events by `EventStreamResponse`.
+    """
+    if not isinstance(route, str):
+        raise ValueError('Route is not specified.')
+    sse = dict(heartbeat=heartbeat, coalesce_window=coalesce_window, max_pending=max_pending)
+    return _method_mapping('GET', route, sse=sse, **kwargs)
+
+
+def websocket_mapping(route: str, **kwargs):
+    """
+    WebSocket mapping, the method takes a `fastapi.WebSocket`. Route options don't apply to WebSocket routes.
+    """
+    if not isinstance(route, str):
+        raise ValueError('Route is not specified.')
+    return _method_mapping('WEBSOCKET', route, **kwargs)
+
+
 # Controllers
 
 
 class Controller:
-    def get_router(self):
+    def get_router(
+            self,
+            container: Optional[DependencyContainer] = None,
+            route_class: type[SprintApiRoute] = SprintApiRoute,
+    ):
         route_prefix = getattr(self, '_sprint_api_route', '')
         args = getattr(self, '_sprint_api_args', {})
+        controller_options = getattr(self, '_sprint_api_options', {})
 
-        router = fastapi.APIRouter(prefix=route_prefix, **args)
+        router = fastapi.APIRouter(prefix=route_prefix, route_class=route_class, **args)
 
         for method_name in dir(self):
             if method_name.startswith('__'):
@@ -79,16 +142,154 @@ class Controller:
             api_type = getattr(method, '_sprint_api_type', None)
             route = getattr(method, '_sprint_api_route', None)
             args = getattr(method, '_sprint_api_args', {})
+            options = {**controller_options, **getattr(method, '_sprint_api_options', {})}
 
             if api_type is None or route is None:
                 continue
 
+            if api_type == 'WEBSOCKET':
+                # response options of the controller only apply to HTTP mappings
+                options = {k: v for k, v in options.items() if k not in ('sse', 'fast_json')}
+            elif options.get('sse', None):
+                args = {'response_class': EventStreamResponse, **args}
+            elif options.get('fast_json', False):
+                args = {'response_class': FastJsonResponse, **args}
+
+            endpoint = _get_endpoint(method, options, container, args)
+
             if api_type in ('GET', 'POST', 'PUT', 'DELETE'):
-                router.api_route(path=route, methods=[api_type], **args)(method)
+                router.api_route(path=route, methods=[api_type], **args)(endpoint)
+            elif api_type == 'WEBSOCKET':
+                router.add_api_websocket_route(route, endpoint, **args)
 
         return router
 
 
+def _get_endpoint(
+        method,
+        options: dict,
+        container: Optional[DependencyContainer],
+        args: dict,
+):
+    """
+    Get the endpoint to bind, which carries the merged route options (`_sprint_api_options`) of the mapping.
+
+    Parameters typed with request-scoped components are declared as FastAPI dependencies,
+    so that they are resolved within the request scope opened for each request.
+
+    SSE mappings are called for the async generator, which is wrapped by an `EventStreamResponse`.
+
+    With `fast_json`, the result is returned as a `FastJsonResponse` dumped by a type adapter of the response
+    model (honoring `response_model_*` dump args), hence FastAPI skips `jsonable_encoder`. Results which are not
+    instances of the response model are validated by the type adapter first, as FastAPI would do.
+    """
+    signature = inspect.signature(method)
+    params = list(signature.parameters.values())
+    bound = False
+
+    if container is not None:
+        type_hints = get_type_hints(method)
+        for i, param in enumerate(params):
+            interface = type_hints.get(param.name, None)
+            if isinstance(interface, type) and container.get_scope(interface) == 'request':
+                dependency = fastapi.Depends(_get_request_component_provider(container, interface))
+                params[i] = param.replace(annotation=Annotated[interface, dependency])
+                bound = True
+
+    sse = options.get('sse', None)
+    fast_json = options.get('fast_json', False)
+    if not bound and not sse and not fast_json and options == getattr(method, '_sprint_api_options', {}):
+        return method
+
+    if sse:
+        if not inspect.isasyncgenfunction(method):
+            raise TypeError(f'SSE mapping {method.__qualname__} is not an async generator function.')
+
+        @functools.wraps(method)
+        async def _endpoint(*args, **kwargs):
+            return EventStreamResponse(method(*args, **kwargs), **sse)
+
+        # otherwise FastAPI unwraps the endpoint, and streams the generator by itself
+        del _endpoint.__wrapped__
+        _endpoint.__signature__ = signature.replace(parameters=params, return_annotation=EventStreamResponse)
+        _endpoint._sprint_api_options = options
+        return _endpoint
+
+    if fast_json:
+        serializer = _get_response_serializer(method, args)
+        status_code = args.get('status_code', None) or 200
+
+        def _to_response(res):
+            if isinstance(res, fastapi.Response):
+                return res
+            return FastJsonResponse(res, status_code=status_code, serializer=serializer)
+    else:
+        def _to_response(res):
+            return res
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def _endpoint(*args, **kwargs):
+            return _to_response(await method(*args, **kwargs))
+    else:
+        @functools.wraps(method)
+        def _endpoint(*args, **kwargs):
+            return _to_response(method(*args, **kwargs))
+
+    _endpoint.__signature__ = signature.replace(parameters=params)
+    _endpoint._sprint_api_options = options
+    return _endpoint
+
+
+def _get_response_serializer(method, args: dict):
+    # same as FastAPI, an explicit `response_model` (even None) takes precedence over the return annotation
+    if 'response_model' in args:
+        response_model = args['response_model']
+    else:
+        response_model = get_type_hints(method).get('return', None)
+
+    if response_model is None or (inspect.isclass(response_model) and issubclass(response_model, fastapi.Response)):
+        return None
+
+    adapter = TypeAdapter(response_model)
+    dump_json = functools.partial(
+        adapter.dump_json,
+        include=args.get('response_model_include', None),
+        exclude=args.get('response_model_exclude', None),
+        by_alias=args.get('response_model_by_alias', True),
+        exclude_unset=args.get('response_model_exclude_unset', False),
+        exclude_defaults=args.get('response_model_exclude_defaults', False),
+        exclude_none=args.get('response_model_exclude_none', False),
+    )
+    # instances of the response model are dumped as is, anything else is validated (and filtered) first
+    model_class = response_model if inspect.isclass(response_model) else None
+
+    def _serialize(content):
+        if model_class is None or not isinstance(content, model_class):
+            try:
+                content = adapter.validate_python(content, from_attributes=True)
+            except ValidationError as e:
+                raise ResponseValidationError(errors=e.errors(), body=content)
+        return dump_json(content)
+
+    return _serialize
+
+
+def _get_request_component_provider(container: DependencyContainer, interface: type):
+    # FastAPI caches the scope dependency per request, so all components of a request share one scope
+    async def _provide(_=fastapi.Depends(_get_request_scope_dependency(container))):
+        return container.resolve(interface)
+    return _provide
+
+
+@functools.cache
+def _get_request_scope_dependency(container: DependencyContainer):
+    async def _request_scope():
+        async with container.request_scope():
+            yield
+    return _request_scope
+
+
 _controller_types: set[type[Controller]] = set()
 
 
@@ -115,7 +316,7 @@ def api_route(route: str, **kwargs):
 
         _controller_types.add(target)
         target._sprint_api_route = route
-        target._sprint_api_args = kwargs
+        target._sprint_api_args, target._sprint_api_options = _split_route_options(kwargs)
 
         return target
 
@@ -0,0 +1,137 @@
+import asyncio
+import contextvars
+import re
+import time
+
+import fastapi
+
+from typing import Optional
+
+from .error import DeadlineExceededError
+from .routing import RouteHandler, SprintApiRoute
+
+
+__all__ = [
+    'DEADLINE_HEADER',
+    'GRPC_TIMEOUT_HEADER',
+    'deadline_route_wrapper',
+    'get_deadline',
+    'get_remaining_time',
+]
+
+
+DEADLINE_HEADER = 'x-request-deadline'
+GRPC_TIMEOUT_HEADER = 'grpc-timeout'
+
+_grpc_timeout_pattern = re.compile(r'^(\d{1,8})([HMSmun])$')
+_grpc_timeout_units = {
+    'H': 3600.0,
+    'M': 60.0,
+    'S': 1.0,
+    'm': 1e-3,
+    'u': 1e-6,
+    'n': 1e-9,
+}
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('sprintapi_deadline', default=None)
+
+
+def get_deadline() -> Optional[float]:
+    """
+    Get the deadline of the current request in `time.monotonic()` clock, or None if there's no deadline.
+    """
+    return _deadline.get()
+
+
+def get_remaining_time() -> Optional[float]:
+    """
+    Get the remaining seconds before the deadline of the current request, or None if there's no deadline.
+
+    Services should pass it as timeout of downstream calls.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def deadline_route_wrapper(route: SprintApiRoute, handler: RouteHandler) -> RouteHandler:
+    """
+    Enforce the deadline of requests, which is the earliest among:
+    - the `timeout` route option, in seconds;
+    - the `X-Request-Deadline` header, as absolute Unix timestamp in seconds;
+    - the gRPC-style `grpc-timeout` header, e.g. `250m` for 250 milliseconds.
+
+    The handler is cancelled at the deadline and `DeadlineExceededError` is raised.
+    """
+    timeout: Optional[float] = route.options.get('timeout', None)
+
+    async def _handler(request: fastapi.Request):
+        budget = _get_header_budget(request.headers)
+        if timeout is not None and (budget is None or timeout < budget):
+            budget = timeout
+
+        if budget is None:
+            return await handler(request)
+        if budget <= 0:
+            raise DeadlineExceededError()
+
+        deadline = time.monotonic() + budget
+        token = _deadline.set(deadline)
+        try:
+            # cancel the current task rather than running the handler in another one, so that context variables
+            # set by the handler (e.g. the request scope of dependencies) stay in the request's context
+            return await _run_with_timeout(handler(request), budget)
+        except _DeadlineTimeout:
+            raise DeadlineExceededError()
+        finally:
+            _deadline.reset(token)
+
+    return _handler
+
+
+class _DeadlineTimeout(Exception):
+    pass
+
+
+async def _run_with_timeout(awaitable, timeout: float):
+    task = asyncio.current_task()
+    timed_out = False
+
+    def _cancel():
+        nonlocal timed_out
+        timed_out = True
+        task.cancel()
+
+    timer = asyncio.get_running_loop().call_later(timeout, _cancel)
+    try:
+        return await awaitable
+    except asyncio.CancelledError:
+        if not timed_out:
+            raise
+        # Python 3.11+ counts cancellation requests, this one is handled here
+        if hasattr(task, 'uncancel'):
+            task.uncancel()
+        raise _DeadlineTimeout()
+    finally:
+        timer.cancel()
+
+
+def _get_header_budget(headers) -> Optional[float]:
+    budget = None
+
+    deadline = headers.get(DEADLINE_HEADER, None)
+    if deadline is not None:
+        try:
+            budget = float(deadline) - time.time()
+        except ValueError:
+            pass
+
+    grpc_timeout = headers.get(GRPC_TIMEOUT_HEADER, None)
+    if grpc_timeout is not None:
+        match = _grpc_timeout_pattern.match(grpc_timeout)
+        if match:
+            value = int(match.group(1)) * _grpc_timeout_units[match.group(2)]
+            budget = value if budget is None else min(budget, value)
+
+    return budget
@@ -0,0 +1,293 @@
+import enum
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import pathlib
+import tempfile
+import typing
+
+import fastapi
+import pydantic
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+from typing import Optional, Union
+
+from .cache import _etag_matches
+from .logging import get_sprintapi_logger
+
+
+__all__ = [
+    'OpenApiDocument',
+    'PrecompressedContent',
+    'StaticAssets',
+]
+
+
+_logger = get_sprintapi_logger('Docs')
+
+_MIN_GZIP_SIZE = 512
+
+
+class PrecompressedContent:
+    """
+    Response body kept in memory as raw and gzipped bytes, served with a strong ETag.
+    """
+    __slots__ = ('body', 'gzip_body', 'etag', 'media_type')
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.etag = b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode('ascii') + b'"'
+
+        gzip_body = gzip.compress(body, compresslevel=9, mtime=0) if len(body) >= _MIN_GZIP_SIZE else None
+        self.gzip_body = gzip_body if gzip_body is not None and len(gzip_body) < len(body) else None
+
+    def get_response(self, request_headers, head: bool = False) -> fastapi.Response:
+        if_none_match = request_headers.get('if-none-match')
+        if if_none_match is not None and _etag_matches(self.etag, if_none_match):
+            response = fastapi.Response(status_code=304)
+            response.raw_headers = [(b'etag', self.etag)]
+            return response
+
+        raw_headers = [
+            (b'content-type', self.media_type.encode('latin-1')),
+            (b'etag', self.etag),
+            (b'cache-control', b'no-cache'),
+        ]
+        body = self.body
+        if self.gzip_body is not None:
+            raw_headers.append((b'vary', b'Accept-Encoding'))
+            if 'gzip' in request_headers.get('accept-encoding', ''):
+                body = self.gzip_body
+                raw_headers.append((b'content-encoding', b'gzip'))
+        raw_headers.append((b'content-length', str(len(body)).encode('latin-1')))
+
+        response = fastapi.Response(status_code=200)
+        response.body = b'' if head else body
+        response.raw_headers = raw_headers
+        return response
+
+
+class StaticAssets:
+    """
+    ASGI app serving the files of a directory from memory, replacing `StaticFiles` for the bundled docs assets.
+
+    Files are read and compressed once, on first request or by `preload()`.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike]):
+        # also accepts an `importlib.resources` traversable
+        self._directory = pathlib.Path(directory) if isinstance(directory, (str, os.PathLike)) else directory
+        self._contents: dict[str, Optional[PrecompressedContent]] = {}
+
+    def preload(self):
+        stack = [('', self._directory)]
+        while stack:
+            prefix, directory = stack.pop()
+            for entry in directory.iterdir():
+                path = f'{prefix}/{entry.name}'
+                if entry.is_dir():
+                    stack.append((path, entry))
+                else:
+                    self._get_content(path)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            raise RuntimeError('StaticAssets only handles HTTP requests.')
+
+        method = scope['method']
+        content = self._get_content(scope['path'][len(scope.get('root_path', '')):]) \
+            if method in ('GET', 'HEAD') else None
+        if content is None:
+            response = fastapi.Response(status_code=404 if method in ('GET', 'HEAD') else 405)
+        else:
+            response = content.get_response(Headers(scope=scope), head=method == 'HEAD')
+        await response(scope, receive, send)
+
+    def _get_content(self, path: str) -> Optional[PrecompressedContent]:
+        try:
+            return self._contents[path]
+        except KeyError:
+            pass
+
+        content = None
+        parts = [p for p in path.split('/') if p]
+        if parts and '..' not in parts:
+            target = self._directory
+            for part in parts:
+                target = target / part
+            if target.is_file():
+                media_type = mimetypes.guess_type(parts[-1])[0] or 'application/octet-stream'
+                if media_type.startswith('text/') or media_type == 'application/javascript':
+                    media_type += '; charset=utf-8'
+                content = PrecompressedContent(target.read_bytes(), media_type)
+
+        # unknown paths are cached too, but only as many as the directory could ever hold
+        if content is not None or len(self._contents) < 1024:
+            self._contents[path] = content
+        return content
+
+
+class OpenApiDocument:
+    """
+    The OpenAPI schema of an app, generated once and served as pre-serialized, pre-gzipped bytes with an ETag.
+
+    With `cache_dir`, the serialized schema is persisted as `openapi-<fingerprint>.json` and loaded on later
+    starts instead of being generated. The fingerprint covers the app info, the FastAPI version, and for every
+    route its path, methods, endpoint, parameters and the fields of the models involved, so that changing any of
+    them regenerates the schema; call `save()` in a build step to ship the file along with the app.
+    """
+
+    def __init__(self, app: fastapi.FastAPI, cache_dir: Union[str, os.PathLike, None] = None):
+        self._app = app
+        self._cache_dir = pathlib.Path(cache_dir) if cache_dir is not None else None
+        self._fingerprint: Optional[str] = None
+        self._content: Optional[PrecompressedContent] = None
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = _get_route_fingerprint(self._app)
+        return self._fingerprint
+
+    @property
+    def cache_path(self) -> Optional[pathlib.Path]:
+        if self._cache_dir is None:
+            return None
+        return self._cache_dir / f'openapi-{self.fingerprint}.json'
+
+    def load(self) -> PrecompressedContent:
+        """
+        Load the schema from the cache dir, or generate (and persist) it. It's a no-op if already loaded.
+        """
+        if self._content is not None:
+            return self._content
+
+        body = None
+        cache_path = self.cache_path
+        if cache_path is not None and cache_path.is_file():
+            try:
+                body = cache_path.read_bytes()
+                self._app.openapi_schema = json.loads(body)
+                _logger.info(f'OpenAPI schema loaded from "{cache_path}".')
+            except (OSError, ValueError) as e:
+                _logger.warning(f'Failed to load OpenAPI schema from "{cache_path}": {e!r}')
+                body = None
+
+        generated = body is None
+        if generated:
+            body = self._generate()
+        self._content = PrecompressedContent(body, 'application/json')
+
+        if generated and cache_path is not None:
+            try:
+                self.save()
+            except OSError as e:
+                _logger.warning(f'Failed to save OpenAPI schema to "{cache_path}": {e!r}')
+        return self._content
+
+    def save(self, cache_dir: Union[str, os.PathLike, None] = None) -> pathlib.Path:
+        """
+        Write the schema to `cache_dir` (or the one given at construction), and return the file path.
+        """
+        if cache_dir is not None:
+            self._cache_dir = pathlib.Path(cache_dir)
+        cache_path = self.cache_path
+        if cache_path is None:
+            raise ValueError('No cache dir to save the OpenAPI schema to.')
+
+        body = self._content.body if self._content is not None else self._generate()
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # write & rename, so that concurrently starting workers never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix='.openapi-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        _logger.info(f'OpenAPI schema saved to "{cache_path}".')
+        return cache_path
+
+    async def endpoint(self, request: fastapi.Request) -> fastapi.Response:
+        return self.load().get_response(request.headers, head=request.method == 'HEAD')
+
+    def _generate(self) -> bytes:
+        self._app.openapi_schema = None
+        schema = self._app.openapi()
+        return json.dumps(schema, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _get_route_fingerprint(app: fastapi.FastAPI) -> str:
+    models: dict[type, None] = {}
+    routes = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or not route.include_in_schema:
+            continue
+        dependant = route.dependant
+        fields = (
+            *dependant.path_params,
+            *dependant.query_params,
+            *dependant.header_params,
+            *dependant.cookie_params,
+            *dependant.body_params,
+        )
+        # pydantic's field info repr covers descriptions, examples... of the params (fastapi's hides them)
+        params = [(f.name, pydantic.fields.FieldInfo.__repr__(f.field_info)) for f in fields]
+        for f in fields:
+            _collect_models(f.field_info.annotation, models)
+        _collect_models(route.response_model, models)
+        routes.append((
+            route.path,
+            sorted(route.methods),
+            route.name,
+            route.status_code,
+            tuple(route.tags),
+            route.summary,
+            route.description,
+            route.deprecated,
+            repr(route.response_model),
+            params,
+        ))
+
+    # schemas cover field descriptions, examples, docstrings, enum members... of the models
+    model_schemas = []
+    for model in models:
+        if issubclass(model, enum.Enum):
+            schema = [(m.name, repr(m.value)) for m in model]
+        else:
+            try:
+                schema = [model.model_json_schema(mode=mode) for mode in ('validation', 'serialization')]
+            except Exception:
+                schema = [(n, repr(f)) for n, f in model.model_fields.items()]
+        model_schemas.append((f'{model.__module__}.{model.__qualname__}', repr(model.__doc__), schema))
+
+    doc = [
+        app.title, app.version, app.openapi_version, app.description, fastapi.__version__,
+        routes, sorted(model_schemas, key=lambda m: m[0]),
+    ]
+    digest = hashlib.blake2b(repr(doc).encode('utf-8'), digest_size=12)
+    return digest.hexdigest()
+
+
+def _collect_models(annotation, models: dict[type, None]):
+    # pydantic models & enums
+    if annotation is None:
+        return
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        models[annotation] = None
+        return
+    if isinstance(annotation, type) and issubclass(annotation, pydantic.BaseModel):
+        if annotation in models:
+            return
+        models[annotation] = None
+        for field in annotation.model_fields.values():
+            _collect_models(field.annotation, models)
+        return
+    for arg in typing.get_args(annotation):
+        _collect_models(arg, models)
@@ -1,5 +1,7 @@
 import enum
+import math
 from pydantic import BaseModel
+from typing import Mapping, Optional
 
 
 __all__ = [
@@ -17,6 +19,7 @@ __all__ = [
     'PermissionDeniedError',
     'TooManyRequestsError',
     'UnauthenticatedError',
+    'UnavailableError',
     'UnimplementedError'
 ]
 
@@ -55,9 +58,10 @@ class Ok(ErrorModel):
 
 
 class Error(Exception):
-    def __init__(self, code: ErrorCode, message: str):
+    def __init__(self, code: ErrorCode, message: str, headers: Optional[Mapping[str, str]] = None):
         self.code = code
         self.message = message
+        self.headers = headers
 
     def json(self):
         return self.model().model_dump_json()
@@ -105,8 +109,9 @@ class PermissionDeniedError(Error):
 
 
 class TooManyRequestsError(Error):
-    def __init__(self, message: str = 'Too many requests.'):
-        super().__init__(code=ErrorCode.UNAVAILABLE, message=message)
+    def __init__(self, message: str = 'Too many requests.', retry_after: Optional[float] = None):
+        headers = {'Retry-After': str(math.ceil(retry_after))} if retry_after is not None else None
+        super().__init__(code=ErrorCode.RESOURCE_EXHAUSTED, message=message, headers=headers)
 
 
 class UnauthenticatedError(Error):
@@ -114,6 +119,11 @@ class UnauthenticatedError(Error):
         super().__init__(code=ErrorCode.UNAUTHENTICATED, message=message)
 
 
+class UnavailableError(Error):
+    def __init__(self, message: str = 'Service unavailable.'):
+        super().__init__(code=ErrorCode.UNAVAILABLE, message=message)
+
+
 class UnimplementedError(Error):
     def __init__(self, message: str = 'Unimplemented method.'):
         super().__init__(code=ErrorCode.UNIMPLEMENTED, message=message)
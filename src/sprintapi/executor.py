@@ -0,0 +1,172 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import importlib
+import inspect
+import os
+
+from pydantic import Field
+from typing import Any, Callable, Optional
+
+from .config import Configuration, configuration
+from .error import UnavailableError
+from .logging import get_sprintapi_logger
+from .metrics import MetricsRegistry, render_counter, render_gauge
+from .service import Service, service
+
+
+__all__ = [
+    'ExecutorConfig',
+    'ExecutorService',
+    'offload',
+]
+
+
+_logger = get_sprintapi_logger('ExecutorService')
+
+_KINDS = ('thread', 'process')
+
+
+@configuration
+class ExecutorConfig(Configuration):
+    thread_pool_size: int = Field(alias='SPRINTAPI_THREAD_POOL_SIZE', default=min(32, (os.cpu_count() or 1) + 4))
+    process_pool_size: int = Field(alias='SPRINTAPI_PROCESS_POOL_SIZE', default=os.cpu_count() or 1)
+    max_queue: int = Field(alias='SPRINTAPI_EXECUTOR_MAX_QUEUE', default=1000)
+
+
+class _PoolStats:
+    __slots__ = ('workers', 'pending', 'completed', 'rejected')
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+
+@service
+class ExecutorService(Service):
+    """
+    Built-in service owning a thread pool and a process pool for blocking and CPU-bound work.
+
+    Registered by importing `sprintapi.executor`. Pools are sized by `ExecutorConfig`, and each pool accepts
+    at most `max_queue` calls waiting for a worker, further calls are rejected with `UnavailableError`.
+    """
+
+    def __init__(self, config: ExecutorConfig, metrics: MetricsRegistry):
+        self._config = config
+        self._pools: dict[str, Optional[concurrent.futures.Executor]] = {kind: None for kind in _KINDS}
+        self._stats = {
+            'thread': _PoolStats(config.thread_pool_size),
+            'process': _PoolStats(config.process_pool_size),
+        }
+        metrics.add_collector(self._collect_metrics)
+
+    async def init(self):
+        global _active_executor
+
+        self._pools['thread'] = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._config.thread_pool_size,
+            thread_name_prefix='sprintapi-executor'
+        )
+        # worker processes are only spawned on first submit
+        self._pools['process'] = concurrent.futures.ProcessPoolExecutor(max_workers=self._config.process_pool_size)
+        _active_executor = self
+
+    async def stop(self):
+        global _active_executor
+
+        if _active_executor is self:
+            _active_executor = None
+        for kind, pool in self._pools.items():
+            if pool is not None:
+                await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+                self._pools[kind] = None
+
+    def get_queue_depth(self, kind: str = 'thread') -> int:
+        stats = self._stats[kind]
+        return max(0, stats.pending - stats.workers)
+
+    async def run(self, fn: Callable, *args, kind: str = 'thread', **kwargs) -> Any:
+        """
+        Run `fn` in the pool of `kind`. Thread calls see the contextvars of the caller.
+        """
+        pool = self._pools.get(kind, None)
+        if pool is None:
+            raise RuntimeError(f'Executor pool "{kind}" is not available.')
+
+        stats = self._stats[kind]
+        if stats.pending >= stats.workers + self._config.max_queue:
+            stats.rejected += 1
+            raise UnavailableError('Executor queue is full.')
+
+        call = functools.partial(fn, *args, **kwargs)
+        if kind == 'thread':
+            call = functools.partial(contextvars.copy_context().run, call)
+
+        stats.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, call)
+        finally:
+            stats.pending -= 1
+            stats.completed += 1
+
+    def _collect_metrics(self):
+        yield from render_gauge(
+            'sprintapi_executor_pending',
+            'Calls running or waiting in the executor pool.',
+            (({'kind': kind}, stats.pending) for kind, stats in self._stats.items())
+        )
+        yield from render_gauge(
+            'sprintapi_executor_queue_depth',
+            'Calls waiting for a worker of the executor pool.',
+            (({'kind': kind}, self.get_queue_depth(kind)) for kind in self._stats)
+        )
+        yield from render_counter(
+            'sprintapi_executor_rejected_total',
+            'Calls rejected as the executor queue is full.',
+            (({'kind': kind}, stats.rejected) for kind, stats in self._stats.items())
+        )
+
+
+_active_executor: Optional[ExecutorService] = None
+
+
+def offload(target=None, /, kind: str = 'thread'):
+    """
+    Run a sync function (or method) in the pools of `ExecutorService`, turning it into a coroutine function.
+
+    Can be used either as `@offload` or `@offload(kind='process')`, also on controller mappings
+    (`@get_mapping` goes above `@offload`). In process mode, the function is looked up by its qualified name in
+    the worker process, and all arguments (`self` included) must be picklable; controllers holding services
+    usually are not, so prefer module-level functions for process mode.
+    """
+    if kind not in _KINDS:
+        raise ValueError(f'Unknown executor kind "{kind}".')
+
+    def _inner(fn):
+        if not inspect.isfunction(fn) or inspect.iscoroutinefunction(fn):
+            raise TypeError(f'{fn} is not a sync function.')
+
+        @functools.wraps(fn)
+        async def _offloaded(*args, **kwargs):
+            executor = _active_executor
+            if executor is None:
+                raise RuntimeError('ExecutorService is not started.')
+            if kind == 'process':
+                return await executor.run(_call_offloaded, fn.__module__, fn.__qualname__, args, kwargs, kind=kind)
+            return await executor.run(fn, *args, kind=kind, **kwargs)
+
+        return _offloaded
+
+    if target is None:
+        return _inner
+    return _inner(target)
+
+
+def _call_offloaded(module: str, qualname: str, args: tuple, kwargs: dict):
+    target = importlib.import_module(module)
+    for name in qualname.split('.'):
+        target = getattr(target, name)
+    return inspect.unwrap(target)(*args, **kwargs)
@@ -0,0 +1,270 @@
+import asyncio
+import collections
+
+import fastapi
+
+from pydantic import Field
+from starlette.websockets import WebSocketDisconnect, WebSocketState
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from .config import Configuration, configuration
+from .logging import get_sprintapi_logger
+from .metrics import MetricsRegistry, render_counter, render_gauge
+from .response import dump_json
+from .service import Service, service
+
+
+__all__ = [
+    'HubClient',
+    'HubConfig',
+    'WebSocketHub',
+]
+
+
+_logger = get_sprintapi_logger('WebSocketHub')
+
+_OVERFLOW_POLICIES = ('drop', 'drop_oldest', 'disconnect')
+
+# close codes
+_GOING_AWAY = 1001
+_TRY_AGAIN_LATER = 1013
+
+
+@configuration
+class HubConfig(Configuration):
+    client_max_queue: int = Field(alias='SPRINTAPI_HUB_CLIENT_MAX_QUEUE', default=256)
+    overflow: str = Field(alias='SPRINTAPI_HUB_OVERFLOW', default='drop')
+
+
+def _to_message(message: Any) -> dict:
+    if isinstance(message, str):
+        return {'type': 'websocket.send', 'text': message}
+    if isinstance(message, (bytes, bytearray)):
+        return {'type': 'websocket.send', 'bytes': bytes(message)}
+    return {'type': 'websocket.send', 'text': dump_json(message).decode('utf-8')}
+
+
+class HubClient:
+    """
+    A connected WebSocket of the hub, with its own bounded send queue drained by a sender task.
+
+    When the queue is full, a message is dropped (`drop`), the oldest queued message is dropped
+    (`drop_oldest`), or the client is disconnected with close code 1013 (`disconnect`).
+    """
+
+    def __init__(self, hub: 'WebSocketHub', websocket: fastapi.WebSocket, max_queue: int, overflow: str):
+        if overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy "{overflow}".')
+
+        self.websocket = websocket
+        self.topics: set[str] = set()
+        self.dropped = 0
+
+        self._hub = hub
+        self._max_queue = max_queue
+        self._overflow = overflow
+        self._queue: collections.deque[dict] = collections.deque()
+        self._ready = asyncio.Event()
+        self._close_code: Optional[int] = None
+        self._sender = asyncio.create_task(self._send_loop())
+
+    @property
+    def closed(self) -> bool:
+        return self._close_code is not None
+
+    def subscribe(self, *topics: str):
+        for topic in topics:
+            self._hub._subscribe(self, topic)
+
+    def unsubscribe(self, *topics: str):
+        for topic in topics:
+            self._hub._unsubscribe(self, topic)
+
+    def send(self, message: Any):
+        """
+        Queue a message to this client only.
+        """
+        self._enqueue(_to_message(message))
+
+    def close(self, code: int = 1000):
+        if self._close_code is not None:
+            return
+        self._close_code = code
+        self._queue.clear()
+        self._ready.set()
+        self._hub._remove(self)
+
+    async def wait_closed(self):
+        await asyncio.shield(self._sender)
+
+    async def receive(self) -> Optional[Any]:
+        """
+        Receive the next text or bytes message, or None once the client disconnected.
+        """
+        message = await self.websocket.receive()
+        if message['type'] == 'websocket.disconnect':
+            self.close(message.get('code', 1000))
+            return None
+        return message.get('text', None) or message.get('bytes', None)
+
+    async def __aenter__(self) -> 'HubClient':
+        return self
+
+    async def __aexit__(self, *_):
+        self.close()
+        await self.wait_closed()
+
+    def _enqueue(self, message: dict):
+        if self._close_code is not None:
+            return
+
+        queue = self._queue
+        if len(queue) >= self._max_queue:
+            self.dropped += 1
+            self._hub._dropped += 1
+            if self._overflow == 'drop':
+                return
+            if self._overflow == 'disconnect':
+                _logger.warning(f'Disconnect slow client, {len(queue)} messages pending.')
+                self.close(_TRY_AGAIN_LATER)
+                return
+            queue.popleft()
+
+        queue.append(message)
+        self._ready.set()
+
+    async def _send_loop(self):
+        websocket = self.websocket
+        queue = self._queue
+        ready = self._ready
+        try:
+            while True:
+                while not queue and self._close_code is None:
+                    ready.clear()
+                    await ready.wait()
+                if self._close_code is not None:
+                    break
+                await websocket.send(queue.popleft())
+        except (WebSocketDisconnect, OSError, RuntimeError):
+            # client is gone, or the websocket is closed by the endpoint
+            self.close()
+            return
+
+        if websocket.application_state == WebSocketState.CONNECTED \
+                and websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await websocket.close(self._close_code)
+            except (OSError, RuntimeError):
+                pass
+
+
+@service
+class WebSocketHub(Service):
+    """
+    Built-in service broadcasting messages to the WebSocket clients subscribed to topics.
+
+    Registered by importing `sprintapi.hub`. A published message is serialized once (`str` as text, `bytes` as
+    binary, others dumped as JSON text), and the same frame is queued to every subscriber; each client's sender
+    task then sends concurrently, so a slow client never holds the publisher or other clients back.
+    """
+
+    def __init__(self, config: HubConfig, metrics: MetricsRegistry):
+        if config.overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy "{config.overflow}".')
+
+        self._config = config
+        self._clients: set[HubClient] = set()
+        self._topics: dict[str, set[HubClient]] = {}
+        self._published = 0
+        self._dropped = 0
+        metrics.add_collector(self._collect_metrics)
+
+    async def stop(self):
+        clients = list(self._clients)
+        for client in clients:
+            client.close(_GOING_AWAY)
+        await asyncio.gather(*(client.wait_closed() for client in clients), return_exceptions=True)
+
+    def connect(
+            self,
+            websocket: fastapi.WebSocket,
+            topics: Iterable[str] = (),
+            max_queue: Optional[int] = None,
+            overflow: Optional[str] = None,
+    ) -> HubClient:
+        """
+        Register an accepted websocket, queue size & overflow policy default to `HubConfig`.
+        """
+        client = HubClient(
+            self,
+            websocket,
+            max_queue if max_queue is not None else self._config.client_max_queue,
+            overflow or self._config.overflow
+        )
+        self._clients.add(client)
+        client.subscribe(*topics)
+        return client
+
+    async def serve(
+            self,
+            websocket: fastapi.WebSocket,
+            topics: Iterable[str] = (),
+            on_message: Optional[Callable[[HubClient, Any], Awaitable[None]]] = None,
+            **kwargs
+    ):
+        """
+        Accept the websocket, and receive messages (passed to `on_message`) until the client disconnects.
+        """
+        await websocket.accept()
+        async with self.connect(websocket, topics, **kwargs) as client:
+            while not client.closed:
+                message = await client.receive()
+                if message is not None and on_message is not None:
+                    await on_message(client, message)
+
+    def publish(self, topic: str, message: Any) -> int:
+        """
+        Queue a message to all subscribers of the topic, and return the number of subscribers.
+        """
+        subscribers = self._topics.get(topic, None)
+        if not subscribers:
+            return 0
+
+        frame = _to_message(message)
+        # a subscriber may be disconnected by its overflow policy during the loop
+        for client in tuple(subscribers):
+            client._enqueue(frame)
+        self._published += 1
+        return len(subscribers)
+
+    def get_subscriber_count(self, topic: str) -> int:
+        return len(self._topics.get(topic, ()))
+
+    def _subscribe(self, client: HubClient, topic: str):
+        if client.closed:
+            return
+        self._topics.setdefault(topic, set()).add(client)
+        client.topics.add(topic)
+
+    def _unsubscribe(self, client: HubClient, topic: str):
+        subscribers = self._topics.get(topic, None)
+        if subscribers is not None:
+            subscribers.discard(client)
+            if not subscribers:
+                del self._topics[topic]
+        client.topics.discard(topic)
+
+    def _remove(self, client: HubClient):
+        for topic in list(client.topics):
+            self._unsubscribe(client, topic)
+        self._clients.discard(client)
+
+    def _collect_metrics(self):
+        yield from render_gauge('sprintapi_hub_clients', 'Connected hub clients.', [({}, len(self._clients))])
+        yield from render_gauge('sprintapi_hub_topics', 'Topics with subscribers.', [({}, len(self._topics))])
+        yield from render_counter('sprintapi_hub_published_total', 'Messages published.', [({}, self._published)])
+        yield from render_counter(
+            'sprintapi_hub_dropped_total',
+            'Messages dropped for slow clients.',
+            [({}, self._dropped)]
+        )
@@ -0,0 +1,303 @@
+import asyncio
+import math
+import time
+
+from typing import Awaitable, Callable, Optional, Sequence
+
+from .utility.asgi_client import AsgiClient
+
+
+__all__ = [
+    'HttpClient',
+    'LoadGenerator',
+    'RouteStats',
+    'Target',
+    'asgi_sender',
+    'compare_reports',
+    'format_report',
+]
+
+
+_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class Target:
+    """
+    A request sent by the load generator, named `METHOD path` in reports.
+    """
+    __slots__ = ('method', 'path', 'query_string', 'headers', 'body', 'name')
+
+    def __init__(
+            self,
+            method: str,
+            path: str,
+            query_string: str = '',
+            headers: Sequence[tuple[str, str]] = (),
+            body: bytes = b'',
+    ):
+        self.method = method.upper()
+        self.path = path
+        self.query_string = query_string
+        self.headers = tuple(headers)
+        self.body = body
+        self.name = f'{self.method} {path}' + (f'?{query_string}' if query_string else '')
+
+    @classmethod
+    def parse(cls, spec: str, headers: Sequence[tuple[str, str]] = (), body: bytes = b'') -> 'Target':
+        """
+        Parse `[METHOD ]path[?query]`, the method defaults to GET.
+        """
+        method, _, path = spec.strip().rpartition(' ')
+        path, _, query_string = path.partition('?')
+        return cls(method or 'GET', path, query_string, headers, body)
+
+
+class RouteStats:
+    __slots__ = ('latencies', 'errors', 'statuses')
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.statuses: dict[int, int] = {}
+
+    def record(self, latency: float, status: int):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status == 0 or status >= 500:
+            self.errors += 1
+
+    def summary(self, duration: float) -> dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        summary = {
+            'requests': count,
+            'errors': self.errors,
+            'throughput': count / duration if duration > 0 else 0,
+            'statuses': {str(k): v for k, v in sorted(self.statuses.items())},
+            'mean_ms': sum(latencies) / count * 1000 if count else 0,
+            'max_ms': latencies[-1] * 1000 if count else 0,
+        }
+        for p in _PERCENTILES:
+            # nearest-rank percentile
+            summary[f'p{p}_ms'] = latencies[max(0, math.ceil(p / 100 * count) - 1)] * 1000 if count else 0
+        return summary
+
+
+Send = Callable[[Target], Awaitable[int]]
+
+
+class LoadGenerator:
+    """
+    Sends requests of `targets` in turn for `duration` seconds, after `warmup` seconds whose results are dropped.
+
+    In closed-loop mode (no `rate`), `concurrency` workers each send a request once the previous one is answered,
+    so the load adapts to the server. In open-loop mode, requests are started at `rate` per second whatever the
+    server does, with at most `concurrency` in flight. Latency is then measured from the time a request was
+    scheduled to start rather than from when it was actually sent, so that a stalled server is charged for the
+    requests it delayed (coordinated omission correction).
+    """
+
+    def __init__(
+            self,
+            send: Send,
+            targets: Sequence[Target],
+            duration: float = 10,
+            warmup: float = 1,
+            concurrency: int = 16,
+            rate: Optional[float] = None,
+    ):
+        if not targets:
+            raise ValueError('No target to send requests to.')
+        self._send = send
+        self._targets = list(targets)
+        self._duration = duration
+        self._warmup = warmup
+        self._concurrency = concurrency
+        self._rate = rate
+
+        self._stats: dict[str, RouteStats] = {t.name: RouteStats() for t in self._targets}
+        self._next = 0
+        self._measure_from = 0.0
+
+    async def run(self) -> dict:
+        begin = time.perf_counter()
+        self._measure_from = begin + self._warmup
+        end = self._measure_from + self._duration
+
+        if self._rate:
+            await self._run_open_loop(begin, end)
+        else:
+            await asyncio.gather(*(self._closed_loop_worker(end) for _ in range(self._concurrency)))
+
+        duration = min(time.perf_counter(), end) - self._measure_from
+        return {
+            'mode': 'open' if self._rate else 'closed',
+            'rate': self._rate,
+            'concurrency': self._concurrency,
+            'duration': duration,
+            'routes': {name: stats.summary(duration) for name, stats in self._stats.items()},
+        }
+
+    def _next_target(self) -> Target:
+        target = self._targets[self._next]
+        self._next = (self._next + 1) % len(self._targets)
+        return target
+
+    async def _call(self, target: Target, started_at: float):
+        try:
+            status = await self._send(target)
+        except Exception:
+            status = 0
+        if started_at >= self._measure_from:
+            self._stats[target.name].record(time.perf_counter() - started_at, status)
+
+    async def _closed_loop_worker(self, end: float):
+        while True:
+            now = time.perf_counter()
+            if now >= end:
+                return
+            await self._call(self._next_target(), now)
+
+    async def _run_open_loop(self, begin: float, end: float):
+        interval = 1 / self._rate
+        slots = asyncio.Semaphore(self._concurrency)
+        tasks = set()
+
+        async def _scheduled(target: Target, intended: float):
+            # waiting for a free slot counts in latency
+            async with slots:
+                await self._call(target, intended)
+
+        i = 0
+        while True:
+            intended = begin + i * interval
+            if intended >= end:
+                break
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(_scheduled(self._next_target(), intended))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            i += 1
+
+        if tasks:
+            await asyncio.wait(tasks)
+
+
+def asgi_sender(client: AsgiClient) -> Send:
+    async def _send(target: Target) -> int:
+        response = await client.request(
+            target.method,
+            target.path,
+            query_string=target.query_string,
+            headers=target.headers,
+            body=target.body
+        )
+        return response.status
+    return _send
+
+
+class HttpClient:
+    """
+    Minimal HTTP/1.1 client over keep-alive loopback connections, one request at a time per connection.
+    """
+
+    def __init__(self, host: str, port: int, connections: int):
+        self._host = host
+        self._port = port
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(connections):
+            self._idle.put_nowait(None)
+
+    async def close(self):
+        while not self._idle.empty():
+            connection = self._idle.get_nowait()
+            if connection is not None:
+                connection[1].close()
+
+    async def send(self, target: Target) -> int:
+        connection = await self._idle.get()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection(self._host, self._port)
+            status, keep_alive = await self._request(*connection, target)
+            if not keep_alive:
+                connection[1].close()
+                connection = None
+        except Exception:
+            if connection is not None:
+                connection[1].close()
+            connection = None
+            raise
+        finally:
+            self._idle.put_nowait(connection)
+        return status
+
+    async def _request(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+            target: Target,
+    ) -> tuple[int, bool]:
+        path = target.path + (f'?{target.query_string}' if target.query_string else '')
+        head = [f'{target.method} {path} HTTP/1.1', f'Host: {self._host}:{self._port}']
+        head.extend(f'{k}: {v}' for k, v in target.headers)
+        if target.body or target.method not in ('GET', 'HEAD', 'DELETE', 'OPTIONS'):
+            head.append(f'Content-Length: {len(target.body)}')
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + target.body)
+
+        lines = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(lines[0].split(' ', 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                k, _, v = line.partition(':')
+                headers[k.strip().lower()] = v.strip()
+
+        if target.method == 'HEAD' or status in (204, 304) or status < 200:
+            pass
+        elif 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';', 1)[0], 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            # body delimited by the end of the connection
+            await reader.read()
+            return status, False
+
+        return status, headers.get('connection', '').lower() != 'close'
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f'{report["mode"]}-loop, {report["duration"]:.1f} s, concurrency {report["concurrency"]}'
+        + (f', rate {report["rate"]:g}/s' if report['rate'] else ''),
+        f'{"route":<40} {"req/s":>10} {"errors":>7} {"p50":>9} {"p90":>9} {"p99":>9} {"p99.9":>9} {"max":>9}',
+    ]
+    for name, s in report['routes'].items():
+        lines.append(
+            f'{name[:40]:<40} {s["throughput"]:>10.1f} {s["errors"]:>7} {s["p50_ms"]:>9.3f} {s["p90_ms"]:>9.3f}'
+            f' {s["p99_ms"]:>9.3f} {s["p99.9_ms"]:>9.3f} {s["max_ms"]:>9.3f}'
+        )
+    lines.append('latencies in ms')
+    return '\n'.join(lines)
+
+
+def compare_reports(baseline: dict, report: dict) -> str:
+    lines = [f'{"route":<40} {"req/s":>17} {"p50":>17} {"p99":>17} {"p99.9":>17}']
+    for name, s in report['routes'].items():
+        base = baseline['routes'].get(name, None)
+        if base is None:
+            lines.append(f'{name[:40]:<40} (not in baseline)')
+            continue
+        cells = []
+        for key in ('throughput', 'p50_ms', 'p99_ms', 'p99.9_ms'):
+            change = s[key] / base[key] - 1 if base[key] else 0
+            cells.append(f'{s[key]:>9.2f} {change:>+7.1%}')
+        lines.append(f'{name[:40]:<40} ' + ' '.join(cells))
+    return '\n'.join(lines)
@@ -1,8 +1,25 @@
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
+
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 __all__ = [
+    'JsonFormatter',
+    'disable_async_logging',
+    'enable_async_logging',
+    'flush_async_logging',
     'get_sprintapi_logger',
     'set_global_level_to_debug',
     'set_global_level_to_info'
@@ -15,6 +32,25 @@ _log_formatter = logging.Formatter(
 )
 
 
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as a single-line JSON object, so that log shippers don't need to parse the line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        doc = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            doc['exc_info'] = self.formatException(record.exc_info)
+        if orjson is not None:
+            return orjson.dumps(doc).decode()
+        return json.dumps(doc, ensure_ascii=False)
+
+
 _stdout_handler = logging.StreamHandler(sys.stdout)
 _stdout_handler.setFormatter(_log_formatter)
 _stdout_handler.setLevel(logging.DEBUG)
@@ -31,6 +67,7 @@ _stderr_filter.filter = lambda record: record.levelno > logging.INFO
 
 _managed_loggers: dict[str, logging.Logger] = {}
 _current_level = logging.INFO
+_current_handlers: list[logging.Handler] = [_stdout_handler, _stderr_handler]
 
 
 def get_sprintapi_logger(name: str):
@@ -41,8 +78,8 @@ def get_sprintapi_logger(name: str):
     logger = logging.getLogger(name)
     logger.propagate = False
     logger.setLevel(_current_level)
-    logger.addHandler(_stdout_handler)
-    logger.addHandler(_stderr_handler)
+    for handler in _current_handlers:
+        logger.addHandler(handler)
     _managed_loggers[name] = logger
 
     return logger
@@ -66,3 +103,188 @@ def set_global_level_to_debug():
 
 def set_global_level_to_info():
     _set_global_level(logging.INFO)
+
+
+# Async logging
+
+
+class _BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Formats records on the caller side, then enqueues them without blocking (unless `block` is set).
+    """
+
+    def __init__(self, q: queue.Queue, block: bool):
+        super().__init__(q)
+        self._block = block
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        if self._block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BatchingListener(threading.Thread):
+    """
+    Background thread writing pre-formatted records in batches, one write and flush per stream per batch.
+    """
+
+    def __init__(self, q: queue.Queue, handler: _BoundedQueueHandler, batch_size: int):
+        super().__init__(name='sprintapi-log-listener', daemon=True)
+        self._queue = q
+        self._handler = handler
+        self._batch_size = batch_size
+        self._reported_dropped = 0
+
+    def run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: list) -> bool:
+        stdout_lines = []
+        stderr_lines = []
+        stop = False
+        flush_events = []
+
+        for item in batch:
+            if item is None:
+                stop = True
+            elif isinstance(item, threading.Event):
+                flush_events.append(item)
+            elif item.levelno <= logging.INFO:
+                stdout_lines.append(item.msg)
+            else:
+                stderr_lines.append(item.msg)
+
+        dropped = self._handler.dropped
+        if dropped != self._reported_dropped:
+            stderr_lines.append(f'{dropped - self._reported_dropped} log records dropped, queue is full.')
+            self._reported_dropped = dropped
+
+        for stream, lines in ((sys.stdout, stdout_lines), (sys.stderr, stderr_lines)):
+            if not lines:
+                continue
+            try:
+                stream.write('\n'.join(lines) + '\n')
+                stream.flush()
+            except Exception:
+                pass
+
+        for event in flush_events:
+            event.set()
+        return stop
+
+
+_async_handler: Optional[_BoundedQueueHandler] = None
+_async_listener: Optional[_BatchingListener] = None
+_async_options: Optional[dict] = None
+
+
+def enable_async_logging(
+        max_queue_size: int = 10000,
+        overflow: str = 'drop',
+        batch_size: int = 256,
+        json_format: bool = False,
+):
+    """
+    Switch all SprintAPI loggers to async mode.
+
+    Records are formatted by the caller, put onto a bounded queue, and written in batches by a background
+    thread, so the event loop never blocks on a slow stdout/stderr. When the queue is full, records are
+    dropped (`overflow='drop'`, a dropped count is reported later) or the caller waits (`overflow='block'`).
+    """
+    global _async_handler, _async_listener, _async_options
+
+    if overflow not in ('drop', 'block'):
+        raise ValueError(f'Unknown overflow policy "{overflow}".')
+    if _async_listener is not None:
+        disable_async_logging()
+
+    q = queue.Queue(maxsize=max_queue_size)
+    _async_handler = _BoundedQueueHandler(q, block=overflow == 'block')
+    _async_handler.setFormatter(JsonFormatter() if json_format else _log_formatter)
+    _async_listener = _BatchingListener(q, _async_handler, batch_size)
+    _async_listener.start()
+    _async_options = dict(
+        max_queue_size=max_queue_size,
+        overflow=overflow,
+        batch_size=batch_size,
+        json_format=json_format
+    )
+
+    _set_global_handlers([_async_handler])
+
+
+def flush_async_logging(timeout: float = 5):
+    """
+    Wait until all records enqueued so far are written, it's a no-op if async logging is not enabled.
+    """
+    if _async_listener is None or not _async_listener.is_alive():
+        return
+
+    event = threading.Event()
+    try:
+        _async_handler.queue.put(event, timeout=timeout)
+    except queue.Full:
+        return
+    event.wait(timeout)
+
+
+def disable_async_logging(timeout: float = 5):
+    global _async_handler, _async_listener, _async_options
+
+    if _async_listener is None:
+        return
+
+    _set_global_handlers([_stdout_handler, _stderr_handler])
+
+    deadline = time.monotonic() + timeout
+    try:
+        _async_handler.queue.put(None, timeout=timeout)
+    except queue.Full:
+        pass
+    _async_listener.join(max(0.0, deadline - time.monotonic()))
+
+    _async_handler = None
+    _async_listener = None
+    _async_options = None
+
+
+def _set_global_handlers(handlers: list[logging.Handler]):
+    global _current_handlers
+
+    for logger in _managed_loggers.values():
+        for handler in _current_handlers:
+            logger.removeHandler(handler)
+        for handler in handlers:
+            logger.addHandler(handler)
+    _current_handlers = handlers
+
+
+def _restart_async_logging_in_child():
+    # listener thread doesn't survive a fork, and the queue may be left locked
+    global _async_listener
+
+    if _async_options is None:
+        return
+    options = _async_options
+    _async_listener = None
+    _set_global_handlers([_stdout_handler, _stderr_handler])
+    enable_async_logging(**options)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_async_logging_in_child)
@@ -0,0 +1,143 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+from pydantic import Field
+from typing import Optional
+
+from .config import Configuration, configuration
+from .logging import get_sprintapi_logger
+from .metrics import Histogram, MetricsRegistry, _escape
+from .service import Service, service
+from .utility.frames import get_frame_owner
+
+
+__all__ = [
+    'LoopMonitorConfig',
+    'LoopMonitorService',
+]
+
+
+_logger = get_sprintapi_logger('LoopMonitorService')
+
+_LAG_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_UNKNOWN_OWNER = 'unknown'
+
+
+@configuration
+class LoopMonitorConfig(Configuration):
+    interval: float = Field(alias='SPRINTAPI_LOOP_MONITOR_INTERVAL', default=0.1)
+    block_threshold: float = Field(alias='SPRINTAPI_LOOP_BLOCK_THRESHOLD', default=0.1)
+
+
+@service
+class LoopMonitorService(Service):
+    """
+    Built-in service measuring the event loop lag, and finding out which controller mapping or service method
+    blocks the loop.
+
+    Registered by importing `sprintapi.loopmonitor`. A task sleeps `interval` seconds in a loop, and observes how
+    late it wakes up. Meanwhile a watchdog thread checks that this task keeps running, and when it has not run
+    for `block_threshold` seconds, captures the stack of the loop thread. Once the loop is back, the block is
+    logged with that stack, and counted against the innermost controller mapping or service method found in it.
+    """
+
+    def __init__(self, config: LoopMonitorConfig, metrics: MetricsRegistry):
+        self._config = config
+        self._lag = Histogram(_LAG_BUCKETS)
+        self._blocked: dict[str, Histogram] = {}
+
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread_id = 0
+        self._heartbeat = 0.0
+        # (heartbeat, owner, stack) of the block seen by the watchdog
+        self._offender: Optional[tuple[float, str, str]] = None
+
+        metrics.add_collector(self._collect_metrics)
+
+    async def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name='sprintapi-loop-watchdog', daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        interval = self._config.interval
+        threshold = self._config.block_threshold
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - expected)
+            last_heartbeat = self._heartbeat
+            self._heartbeat = time.monotonic()
+            self._lag.observe(lag)
+            if lag >= threshold:
+                self._record_block(lag, last_heartbeat)
+
+    def _record_block(self, lag: float, last_heartbeat: float):
+        offender = self._offender
+        if offender is not None and offender[0] == last_heartbeat:
+            _, owner, stack = offender
+        else:
+            # too short for the watchdog to see it
+            owner, stack = _UNKNOWN_OWNER, ''
+        self._offender = None
+
+        histogram = self._blocked.get(owner, None)
+        if histogram is None:
+            histogram = self._blocked[owner] = Histogram()
+        histogram.observe(lag)
+
+        if stack:
+            _logger.warning(f'Event loop blocked for {lag:.3f} s by {owner}, at:\n{stack}')
+        else:
+            _logger.warning(f'Event loop blocked for {lag:.3f} s.')
+
+    def _watch(self):
+        stale_after = self._config.interval + self._config.block_threshold
+        poll = max(0.005, self._config.block_threshold / 2)
+        while not self._stopping.wait(poll):
+            heartbeat = self._heartbeat
+            offender = self._offender
+            if time.monotonic() - heartbeat < stale_after or (offender is not None and offender[0] == heartbeat):
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id, None)
+            if frame is None:
+                continue
+            try:
+                owner = get_frame_owner(frame) or _UNKNOWN_OWNER
+                stack = ''.join(traceback.format_stack(frame))
+            finally:
+                del frame
+            self._offender = (heartbeat, owner, stack)
+
+    def _collect_metrics(self):
+        yield '# HELP sprintapi_event_loop_lag_seconds Delay of the event loop in running a scheduled callback.'
+        yield '# TYPE sprintapi_event_loop_lag_seconds histogram'
+        yield from self._lag.render('sprintapi_event_loop_lag_seconds', '')
+        yield '# HELP sprintapi_event_loop_blocked_seconds Event loop blocks over the threshold, by offender.'
+        yield '# TYPE sprintapi_event_loop_blocked_seconds histogram'
+        for owner, histogram in list(self._blocked.items()):
+            yield from histogram.render('sprintapi_event_loop_blocked_seconds', f'owner="{_escape(owner)}"')
@@ -0,0 +1,167 @@
+import bisect
+import time
+
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from starlette.exceptions import HTTPException
+from typing import Callable, Iterable
+
+from .error import Error, ErrorCode
+from .routing import RouteHandler, SprintApiRoute
+
+
+__all__ = [
+    'Histogram',
+    'MetricsRegistry',
+    'RouteMetrics',
+    'render_counter',
+    'render_gauge',
+]
+
+
+_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: tuple[float, ...] = _LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> Iterable[str]:
+        sep = ',' if labels else ''
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class RouteMetrics:
+    """
+    Pre-allocated counters of one route.
+
+    Only updated on the event loop thread, hence plain attributes without any lock.
+    """
+    __slots__ = ('labels', 'requests', 'in_flight', 'latency', 'errors')
+
+    def __init__(self, method: str, path: str):
+        self.labels = f'method="{method}",route="{_escape(path)}"'
+        self.requests = 0
+        self.in_flight = 0
+        self.latency = Histogram()
+        self.errors = [0] * len(ErrorCode)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._routes: dict[tuple[str, str], RouteMetrics] = {}
+        self._collectors: list[Callable[[], Iterable[str]]] = []
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]):
+        """
+        Add a collector yielding extra lines in Prometheus text format, which is called on every render.
+        """
+        self._collectors.append(collector)
+
+    def get_route_metrics(self, method: str, path: str) -> RouteMetrics:
+        key = (method, path)
+        metrics = self._routes.get(key, None)
+        if metrics is None:
+            metrics = self._routes[key] = RouteMetrics(method, path)
+        return metrics
+
+    def render(self) -> str:
+        lines = []
+        routes = list(self._routes.values())
+
+        lines.append('# HELP sprintapi_requests_total Total requests handled by the route.')
+        lines.append('# TYPE sprintapi_requests_total counter')
+        lines.extend(f'sprintapi_requests_total{{{m.labels}}} {m.requests}' for m in routes)
+
+        lines.append('# HELP sprintapi_requests_in_flight Requests being handled by the route.')
+        lines.append('# TYPE sprintapi_requests_in_flight gauge')
+        lines.extend(f'sprintapi_requests_in_flight{{{m.labels}}} {m.in_flight}' for m in routes)
+
+        lines.append('# HELP sprintapi_request_duration_seconds Request handling latency of the route.')
+        lines.append('# TYPE sprintapi_request_duration_seconds histogram')
+        for m in routes:
+            lines.extend(m.latency.render('sprintapi_request_duration_seconds', m.labels))
+
+        lines.append('# HELP sprintapi_request_errors_total Errors raised by the route, by error code.')
+        lines.append('# TYPE sprintapi_request_errors_total counter')
+        for m in routes:
+            for code, count in zip(ErrorCode, m.errors):
+                if count:
+                    lines.append(f'sprintapi_request_errors_total{{{m.labels},code="{code.name}"}} {count}')
+
+        for collector in self._collectors:
+            lines.extend(collector())
+
+        return '\n'.join(lines) + '\n'
+
+    def route_wrapper(self, route: SprintApiRoute, handler: RouteHandler) -> RouteHandler:
+        metrics = self.get_route_metrics(','.join(sorted(route.methods)), route.path)
+        errors = metrics.errors
+        latency = metrics.latency
+
+        async def _handler(request):
+            metrics.in_flight += 1
+            begin = time.perf_counter()
+            try:
+                return await handler(request)
+            except Error as e:
+                errors[e.code] += 1
+                raise
+            except (RequestValidationError, ValidationError):
+                errors[ErrorCode.INVALID_ARGUMENT] += 1
+                raise
+            except HTTPException:
+                raise
+            except Exception:
+                errors[ErrorCode.INTERNAL] += 1
+                raise
+            finally:
+                metrics.in_flight -= 1
+                metrics.requests += 1
+                latency.observe(time.perf_counter() - begin)
+
+        return _handler
+
+
+def render_counter(name: str, description: str, samples: Iterable[tuple[dict[str, str], float]]) -> Iterable[str]:
+    """
+    Render a monotonic total, whose name should end with `_total`.
+    """
+    return _render_samples(name, description, 'counter', samples)
+
+
+def render_gauge(name: str, description: str, samples: Iterable[tuple[dict[str, str], float]]) -> Iterable[str]:
+    return _render_samples(name, description, 'gauge', samples)
+
+
+def _render_samples(
+        name: str,
+        description: str,
+        metric_type: str,
+        samples: Iterable[tuple[dict[str, str], float]]
+) -> Iterable[str]:
+    yield f'# HELP {name} {description}'
+    yield f'# TYPE {name} {metric_type}'
+    for labels, value in samples:
+        label_str = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        yield f'{name}{{{label_str}}} {value}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
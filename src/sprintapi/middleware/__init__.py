@@ -1 +1,4 @@
+from .compression import CompressionMiddleware
 from .cors import CorsMiddleware
+from .in_flight import InFlightMiddleware, InFlightTracker
+from .rate_limit import RateLimitMiddleware
@@ -0,0 +1,187 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Callable, Iterable, Optional
+
+from ..compression import (
+    COMPRESS_SCOPE_KEY,
+    BrotliEncoder,
+    Encoder,
+    GzipEncoder,
+    is_brotli_available,
+)
+
+
+__all__ = ['CompressionMiddleware']
+
+
+# bodies of these types are either streamed events or already compressed
+_SKIPPED_CONTENT_TYPES = (
+    b'text/event-stream',
+    # compressed raster images, unlike e.g. image/svg+xml
+    b'image/png',
+    b'image/jpeg',
+    b'image/gif',
+    b'image/webp',
+    b'image/avif',
+    b'image/heic',
+    b'video/',
+    b'audio/',
+    b'font/woff',
+    b'application/zip',
+    b'application/gzip',
+    b'application/x-gzip',
+    b'application/octet-stream',
+)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing response bodies with brotli (if the `brotli` package is installed) or gzip,
+    following the `Accept-Encoding` of the request.
+
+    Bodies are compressed chunk by chunk as they are sent, so streaming responses are never buffered. Responses
+    are sent as is when their body is smaller than `minimum_size` (known from `Content-Length` or a single
+    body message), when they already have a `Content-Encoding`, when their content type is an event stream or
+    already compressed, or when the mapping opted out with `compress=False`.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            minimum_size: int = 1024,
+            gzip_level: int = 6,
+            brotli_quality: int = 4,
+            encodings: Iterable[str] = ('br', 'gzip'),
+    ):
+        self.app = app
+        self._minimum_size = minimum_size
+
+        factories: dict[bytes, Callable[[], Encoder]] = {b'gzip': lambda: GzipEncoder(gzip_level)}
+        if is_brotli_available():
+            factories[b'br'] = lambda: BrotliEncoder(brotli_quality)
+        # in order of preference
+        self._encoders = [(e.encode('latin-1'), factories[e.encode('latin-1')])
+                          for e in encodings if e.encode('latin-1') in factories]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or scope['method'] == 'HEAD':
+            await self.app(scope, receive, send)
+            return
+
+        factory = self._select_encoder(scope)
+        if factory is None:
+            await self.app(scope, receive, send)
+            return
+
+        minimum_size = self._minimum_size
+        start_message: Optional[Message] = None
+        encoder: Optional[Encoder] = None
+        passthrough = False
+
+        async def _send(message: Message):
+            nonlocal start_message, encoder, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            message_type = message['type']
+            if message_type == 'http.response.start':
+                start_message = message
+                return
+            if message_type != 'http.response.body':
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            if encoder is None:
+                headers = start_message['headers']
+                if not _should_compress(scope, start_message['status'], headers, body, more_body, minimum_size):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                encoder = factory()
+                start_message['headers'] = _get_encoded_headers(headers, encoder.name)
+                await send(start_message)
+
+            if more_body:
+                await send({'type': 'http.response.body', 'body': encoder.compress(body), 'more_body': True})
+            else:
+                await send({'type': 'http.response.body', 'body': encoder.finish(body)})
+
+        await self.app(scope, receive, _send)
+
+    def _select_encoder(self, scope: Scope) -> Optional[Callable[[], Encoder]]:
+        accept_encoding = b''
+        for k, v in scope['headers']:
+            if k == b'accept-encoding':
+                accept_encoding = v.lower()
+                break
+        if not accept_encoding:
+            return None
+
+        accepted = set()
+        for item in accept_encoding.split(b','):
+            name, _, params = item.partition(b';')
+            params = params.replace(b' ', b'')
+            if params.startswith(b'q=') and _parse_q(params[2:]) <= 0:
+                continue
+            accepted.add(name.strip())
+
+        for name, factory in self._encoders:
+            if name in accepted or b'*' in accepted:
+                return factory
+        return None
+
+
+def _parse_q(value: bytes) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return 0
+
+
+def _should_compress(scope: Scope, status: int, headers, body: bytes, more_body: bool, minimum_size: int) -> bool:
+    if scope.get(COMPRESS_SCOPE_KEY, True) is False or status < 200 or status in (204, 304):
+        return False
+
+    content_length = None
+    for k, v in headers:
+        if k == b'content-encoding':
+            return False
+        if k == b'content-type' and v.lower().startswith(_SKIPPED_CONTENT_TYPES):
+            return False
+        if k == b'content-length':
+            content_length = int(v)
+
+    if content_length is None:
+        # streamed without a known length, small bodies can only be told from a single body message
+        return more_body or len(body) >= minimum_size
+    return content_length >= minimum_size
+
+
+def _get_encoded_headers(headers, encoding: bytes) -> list[tuple[bytes, bytes]]:
+    encoded = []
+    vary = None
+    for k, v in headers:
+        if k == b'content-length':
+            continue
+        if k == b'etag' and not v.startswith(b'W/'):
+            # the encoded body is not byte-equal to the original
+            v = b'W/' + v
+        if k == b'vary':
+            vary = v
+            continue
+        encoded.append((k, v))
+
+    encoded.append((b'content-encoding', encoding))
+    if vary is None:
+        encoded.append((b'vary', b'Accept-Encoding'))
+    elif b'accept-encoding' in vary.lower() or vary == b'*':
+        encoded.append((b'vary', vary))
+    else:
+        encoded.append((b'vary', vary + b', Accept-Encoding'))
+    return encoded
@@ -1,19 +1,81 @@
-import fastapi
+from typing import Iterable
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
 __all__ = ['CorsMiddleware']
 
 
-class CorsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        if request.method != 'OPTIONS':
-            response = await call_next(request)
-            response.headers['Access-Control-Allow-Origin'] = '*'
-            return response
-        return fastapi.Response(status_code=200, headers={
-            'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-            'Access-Control-Allow-Headers': 'Authorization, Content-Type',
-            'Access-Control-Allow-Origin': '*',
-        })
+_DEFAULT_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'OPTIONS')
+_DEFAULT_HEADERS = ('Authorization', 'Content-Type')
+
+
+class CorsMiddleware:
+    """
+    Pure ASGI CORS middleware.
+
+    All header byte-strings are built once on construction, so the per-request cost is a header scan and
+    a list concatenation on `http.response.start`. Body messages are forwarded untouched, hence streaming
+    and SSE responses are never buffered.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            allow_origins: Iterable[str] = ('*',),
+            allow_methods: Iterable[str] = _DEFAULT_METHODS,
+            allow_headers: Iterable[str] = _DEFAULT_HEADERS,
+            max_age: int = 600,
+    ):
+        self.app = app
+
+        allow_origins = tuple(allow_origins)
+        self._allow_all_origins = '*' in allow_origins
+        self._allow_origins = frozenset(o.encode('latin-1') for o in allow_origins)
+
+        methods = ', '.join(m.upper() for m in allow_methods).encode('latin-1')
+        headers = ', '.join(allow_headers).encode('latin-1')
+
+        self._preflight_headers = [
+            (b'access-control-allow-methods', methods),
+            (b'access-control-allow-headers', headers),
+            (b'access-control-max-age', str(max_age).encode('latin-1')),
+            (b'content-length', b'0'),
+        ]
+        self._wildcard_origin_headers = [(b'access-control-allow-origin', b'*')]
+        # responses depend on the origin, allowed or not, so that shared caches keep them apart
+        self._vary_origin_headers = [(b'vary', b'Origin')]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        origin_headers = self._get_origin_headers(scope)
+
+        if scope['method'] == 'OPTIONS':
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': self._preflight_headers + origin_headers,
+            })
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        async def _send(message: Message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = list(message.get('headers', ())) + origin_headers
+            await send(message)
+
+        await self.app(scope, receive, _send)
+
+    def _get_origin_headers(self, scope: Scope):
+        if self._allow_all_origins:
+            return self._wildcard_origin_headers
+
+        for key, value in scope['headers']:
+            if key == b'origin':
+                if value in self._allow_origins:
+                    return [(b'access-control-allow-origin', value), (b'vary', b'Origin')]
+                break
+        return self._vary_origin_headers
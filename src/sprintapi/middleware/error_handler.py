@@ -5,11 +5,15 @@ from ..error import (
     ErrorCode,
     InvalidArgumentError,
 )
+from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
+from typing import Callable, Optional, Union
 
 
 __all__ = [
-    'register_sprintapi_errors'
+    'register_error',
+    'register_sprintapi_errors',
+    'render_error',
 ]
 
 
@@ -34,42 +38,122 @@ _error_code_map = {
     ErrorCode.UNAUTHENTICATED: 401
 }
 
+_json_headers = {'Content-Type': 'application/json'}
+_event_stream_headers = {'Content-Type': 'text/event-stream'}
 
-def _register_sprintapi_error_handler(app: fastapi.FastAPI):
-    def _handler(request: fastapi.Request, exc: Error):
-        if request.headers.get('accept') == 'text/event-stream':
-            return fastapi.Response(
-                status_code=200,
-                headers={
-                    'Content-Type': 'text/event-stream',
-                },
-                content=f'event: abort\ndata: {exc.json()}\n\n'
-            )
+
+# Error registry
+
+
+ErrorBodyRenderer = Callable[[Error], Union[str, bytes]]
+
+_registered_errors: dict[type[Error], tuple[Optional[int], Optional[ErrorBodyRenderer]]] = {}
+
+
+class _ErrorRendering:
+    """
+    Resolved rendering of an error class, with the response bodies of its default instance pre-rendered.
+    """
+    __slots__ = ('status_code', 'render', 'default_code', 'default_message', 'body', 'event_stream_body')
+
+    def __init__(self, error_type: type[Error]):
+        self.status_code = None
+        self.render = None
+        for t in error_type.__mro__:
+            status_code, render = _registered_errors.get(t, (None, None))
+            self.status_code = self.status_code or status_code
+            self.render = self.render or render
+        self.render = self.render or _render_body
+
+        # errors that can be constructed without arguments have default code & message
+        try:
+            default = error_type()
+        except Exception:
+            default = None
+
+        self.default_code = default.code if default is not None else None
+        self.default_message = default.message if default is not None else None
+        self.body = self.render(default) if default is not None else None
+        self.event_stream_body = _to_event_stream_body(self.body) if default is not None else None
+
+
+_error_renderings: dict[type[Error], _ErrorRendering] = {}
+
+
+def register_error(
+        error_type: type[Error],
+        status_code: Optional[int] = None,
+        render: Optional[ErrorBodyRenderer] = None,
+):
+    """
+    Register the HTTP status code and/or the body renderer of an `Error` class (and its subclasses).
+
+    Without a registered status code, the status code is mapped from the error code.
+    """
+    if not isinstance(error_type, type) or not issubclass(error_type, Error):
+        raise TypeError(f'{error_type} is not a subclass of Error.')
+
+    _registered_errors[error_type] = (status_code, render)
+    _error_renderings.clear()
+
+
+def render_error(exc: Error, event_stream: bool = False) -> fastapi.Response:
+    rendering = _error_renderings.get(type(exc), None)
+    if rendering is None:
+        rendering = _error_renderings[type(exc)] = _ErrorRendering(type(exc))
+
+    is_default = (
+        rendering.body is not None
+        and exc.code == rendering.default_code
+        and exc.message == rendering.default_message
+    )
+
+    if event_stream:
         return fastapi.Response(
-            status_code=_error_code_map.get(exc.code, 500),
-            content=exc.json()
+            status_code=200,
+            headers={**_event_stream_headers, **exc.headers} if exc.headers else _event_stream_headers,
+            content=rendering.event_stream_body if is_default else _to_event_stream_body(rendering.render(exc))
         )
+    return fastapi.Response(
+        status_code=rendering.status_code or _error_code_map.get(exc.code, 500),
+        headers={**_json_headers, **exc.headers} if exc.headers else _json_headers,
+        content=rendering.body if is_default else rendering.render(exc)
+    )
+
+
+def _render_body(exc: Error) -> bytes:
+    return exc.json().encode('utf-8')
+
+
+def _to_event_stream_body(body: Union[str, bytes]) -> bytes:
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return b'event: abort\ndata: ' + body + b'\n\n'
+
+
+# Handlers
+
+
+def _is_event_stream(request: fastapi.Request):
+    return request.headers.get('accept') == 'text/event-stream'
+
+
+def _register_sprintapi_error_handler(app: fastapi.FastAPI):
+    # async handlers, otherwise Starlette runs them in the threadpool
+    async def _handler(request: fastapi.Request, exc: Error):
+        return render_error(exc, _is_event_stream(request))
     app.add_exception_handler(Error, _handler)
 
 
-def _register_pydantic_validation_error(app: fastapi.FastAPI):
-    def _handler(request: fastapi.Request, _):
-        exc = InvalidArgumentError()
-        if request.headers.get('accept') == 'text/event-stream':
-            return fastapi.Response(
-                status_code=200,
-                headers={
-                    'Content-Type': 'text/event-stream',
-                },
-                content=f'event: abort\ndata: {exc.json()}\n\n'
-            )
-        return fastapi.Response(
-            status_code=400,
-            content=exc.json()
-        )
+def _register_validation_error(app: fastapi.FastAPI):
+    error = InvalidArgumentError()
+
+    async def _handler(request: fastapi.Request, _):
+        return render_error(error, _is_event_stream(request))
     app.add_exception_handler(ValidationError, _handler)
+    app.add_exception_handler(RequestValidationError, _handler)
 
 
 def register_sprintapi_errors(app: fastapi.FastAPI):
     _register_sprintapi_error_handler(app)
-    _register_pydantic_validation_error(app)
+    _register_validation_error(app)
@@ -0,0 +1,134 @@
+import asyncio
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Iterable, Optional
+
+from .error_handler import render_error
+from ..error import UnavailableError
+
+
+__all__ = [
+    'InFlightMiddleware',
+    'InFlightTracker',
+]
+
+
+class InFlightTracker:
+    """
+    Count of in-flight HTTP requests, used to drain the server on shutdown.
+
+    Event streams are not counted once their response has started, since they last until the client leaves;
+    instead they are ended (as if the client had disconnected) when draining starts.
+
+    Only updated on the event loop thread, hence plain attributes without any lock.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+        self._drained: Optional[asyncio.Event] = None
+        self._streams: set[asyncio.Event] = set()
+
+    def start_draining(self):
+        """
+        Reject new requests from now on.
+        """
+        self.draining = True
+        if self._drained is None:
+            self._drained = asyncio.Event()
+        if self.in_flight == 0:
+            self._drained.set()
+        for stream in self._streams:
+            stream.set()
+
+    async def wait_drained(self, timeout: Optional[float]) -> bool:
+        """
+        Wait for in-flight requests to finish, returns False if some are still running after `timeout` seconds.
+        """
+        self.start_draining()
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _release(self):
+        self.in_flight -= 1
+        if self.in_flight == 0 and self._drained is not None:
+            self._drained.set()
+
+    def _add_stream(self) -> asyncio.Event:
+        stream = asyncio.Event()
+        if self.draining:
+            stream.set()
+        self._streams.add(stream)
+        return stream
+
+
+class InFlightMiddleware:
+    """
+    Pure ASGI middleware counting HTTP requests in an `InFlightTracker`.
+
+    Once the tracker is draining, new requests (but those to `exempt_paths`) are answered with 503 and
+    `Connection: close`.
+    """
+
+    def __init__(self, app: ASGIApp, tracker: InFlightTracker, exempt_paths: Iterable[str] = ()):
+        self.app = app
+        self._tracker = tracker
+        self._exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        tracker = self._tracker
+        if tracker.draining and scope['path'] not in self._exempt_paths:
+            event_stream = any(k == b'accept' and v == b'text/event-stream' for k, v in scope['headers'])
+            response = render_error(UnavailableError('Server is shutting down.'), event_stream)
+            response.headers['connection'] = 'close'
+            await response(scope, receive, send)
+            return
+
+        tracker.in_flight += 1
+        released = False
+        stream: Optional[asyncio.Event] = None
+
+        async def _send(message: Message):
+            nonlocal released, stream
+            if message['type'] == 'http.response.start' and _is_event_stream(message):
+                released = True
+                tracker._release()
+                stream = tracker._add_stream()
+            await send(message)
+
+        async def _receive() -> Message:
+            if stream is None:
+                return await receive()
+            # ends the event stream once draining starts
+            receiving = asyncio.ensure_future(receive())
+            draining = asyncio.ensure_future(stream.wait())
+            try:
+                await asyncio.wait((receiving, draining), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                draining.cancel()
+            if receiving.done():
+                return receiving.result()
+            receiving.cancel()
+            return {'type': 'http.disconnect'}
+
+        try:
+            await self.app(scope, _receive, _send)
+        finally:
+            if stream is not None:
+                tracker._streams.discard(stream)
+            if not released:
+                tracker._release()
+
+
+def _is_event_stream(message: Message) -> bool:
+    for k, v in message.get('headers', ()):
+        if k.lower() == b'content-type':
+            return v.lower().startswith(b'text/event-stream')
+    return False
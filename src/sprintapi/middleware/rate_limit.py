@@ -0,0 +1,34 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .error_handler import render_error
+from ..error import TooManyRequestsError
+from ..ratelimit import RateLimit
+
+
+__all__ = ['RateLimitMiddleware']
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware applying a `RateLimit` to all HTTP requests.
+
+    Rejected requests are answered by the SprintAPI error renderer, with a `Retry-After` header.
+    """
+
+    def __init__(self, app: ASGIApp, limit: RateLimit):
+        self.app = app
+        self._limit = limit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self._limit.acquire(scope)
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        event_stream = any(k == b'accept' and v == b'text/event-stream' for k, v in scope['headers'])
+        response = render_error(TooManyRequestsError(retry_after=retry_after), event_stream)
+        await response(scope, receive, send)
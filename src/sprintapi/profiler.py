@@ -0,0 +1,104 @@
+import asyncio
+import collections
+import hmac
+import sys
+import threading
+import time
+
+import fastapi
+
+from fastapi.responses import PlainTextResponse
+from types import CodeType
+
+from .error import InvalidArgumentError, UnauthenticatedError, UnavailableError
+from .logging import get_sprintapi_logger
+from .utility.frames import get_frame_label
+
+
+__all__ = [
+    'SamplingProfiler',
+    'sample_stacks',
+]
+
+
+_logger = get_sprintapi_logger('SamplingProfiler')
+
+
+def sample_stacks(duration: float, interval: float = 0.01) -> str:
+    """
+    Sample the stacks of all other threads every `interval` seconds for `duration` seconds, in the calling thread.
+
+    Returns collapsed stacks (`thread;outer;...;inner count` lines), as read by flamegraph tools. Frames of
+    controller mappings are labeled by their route.
+    """
+    own_id = threading.get_ident()
+    labels: dict[CodeType, str] = {}
+    counts: collections.Counter = collections.Counter()
+
+    end = time.monotonic() + duration
+    while True:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code, None)
+                if label is None:
+                    label = get_frame_label(frame).replace(';', ':')
+                    # only methods may be labeled by their instance
+                    if not code.co_argcount or code.co_varnames[0] != 'self':
+                        labels[code] = label
+                stack.append(label)
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f'thread-{thread_id}').replace(';', ':').replace(' ', '_'))
+            counts[';'.join(reversed(stack))] += 1
+
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(interval, remaining))
+
+    return ''.join(f'{stack} {count}\n' for stack, count in counts.most_common())
+
+
+class SamplingProfiler:
+    """
+    Endpoint profiling the process on demand, as `GET ...?seconds=10&interval=0.01` with a bearer `token`.
+
+    The sampler thread only exists while a profile is taken, one at a time.
+    """
+
+    def __init__(self, token: str, max_seconds: float = 60):
+        if not token:
+            raise ValueError('Profiler token is empty.')
+        self._token = token.encode('utf-8')
+        self._max_seconds = max_seconds
+        self._running = False
+
+    async def endpoint(self, request: fastapi.Request):
+        scheme, _, token = request.headers.get('authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode('utf-8'), self._token):
+            raise UnauthenticatedError()
+
+        try:
+            seconds = float(request.query_params.get('seconds', 10))
+            interval = float(request.query_params.get('interval', 0.01))
+        except ValueError:
+            raise InvalidArgumentError('Invalid profile duration or interval.')
+        if not 0 < seconds <= self._max_seconds or not 0.001 <= interval <= seconds:
+            raise InvalidArgumentError(
+                f'Profile duration must be within (0, {self._max_seconds}] seconds, '
+                f'and interval within [0.001, duration] seconds.'
+            )
+
+        if self._running:
+            raise UnavailableError('A profile is already being taken.')
+        self._running = True
+        try:
+            _logger.info(f'Profiling for {seconds} s.')
+            stacks = await asyncio.to_thread(sample_stacks, seconds, interval)
+        finally:
+            self._running = False
+        return PlainTextResponse(stacks)
@@ -0,0 +1,134 @@
+import time
+
+import fastapi
+
+from starlette.types import Scope
+from typing import Callable, Optional, Union
+
+from .error import TooManyRequestsError
+from .routing import RouteHandler, SprintApiRoute
+
+
+__all__ = [
+    'RateLimit',
+    'rate_limit_route_wrapper',
+]
+
+
+KeyFunc = Callable[[Scope], Optional[str]]
+
+
+class RateLimit:
+    """
+    In-memory token-bucket rate limiter.
+
+    Each key gets a bucket of `burst` tokens (defaults to `rate`) refilled at `rate` tokens per second, and
+    each request takes one token. Buckets are refilled lazily on access, and are spread over `shards` dicts
+    which are swept independently; a bucket idle for `burst / rate` seconds is full again, hence can be
+    evicted without changing any decision. Each shard also keeps at most `max_keys / shards` buckets, so that
+    memory stays bounded under high-cardinality keys.
+
+    Buckets are keyed by `key`:
+    - `'ip'`: client address;
+    - `'header:<name>'`: value of the request header, requests without the header are not limited;
+    - a callable taking the ASGI scope and returning the key, or None to skip limiting.
+
+    All accesses happen on the event loop thread, so no lock is involved.
+    """
+
+    def __init__(
+            self,
+            rate: float,
+            burst: Optional[float] = None,
+            key: Union[str, KeyFunc] = 'ip',
+            shards: int = 16,
+            max_keys: int = 100000,
+    ):
+        if rate <= 0:
+            raise ValueError('Rate must be positive.')
+
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._key_func = _get_key_func(key)
+
+        self._idle_timeout = self.burst / rate
+        self._shard_size = max(1, max_keys // shards)
+        self._shards: list[dict[str, list[float]]] = [{} for _ in range(shards)]
+        self._sweep_at = [0.0] * shards
+
+    def acquire(self, scope: Scope) -> float:
+        """
+        Take a token for the request, returns 0 if allowed, otherwise the seconds to wait for the next token.
+        """
+        key = self._key_func(scope)
+        if key is None:
+            return 0
+
+        now = time.monotonic()
+        index = hash(key) % len(self._shards)
+        shard = self._shards[index]
+
+        bucket = shard.get(key, None)
+        if bucket is None:
+            if now >= self._sweep_at[index] or len(shard) >= self._shard_size:
+                self._sweep(index, now)
+            shard[key] = [self.burst - 1, now]
+            return 0
+
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0
+
+        bucket[0] = tokens
+        return (1 - tokens) / self.rate
+
+    def _sweep(self, index: int, now: float):
+        shard = self._shards[index]
+        idle_before = now - self._idle_timeout
+        for key in [k for k, (_, last) in shard.items() if last <= idle_before]:
+            del shard[key]
+
+        # still full of active keys, evict the earliest inserted ones
+        while len(shard) >= self._shard_size:
+            del shard[next(iter(shard))]
+
+        self._sweep_at[index] = now + self._idle_timeout
+
+
+def rate_limit_route_wrapper(route: SprintApiRoute, handler: RouteHandler) -> RouteHandler:
+    limit: Optional[RateLimit] = route.options.get('rate_limit', None)
+    if limit is None:
+        return handler
+
+    async def _handler(request: fastapi.Request):
+        retry_after = limit.acquire(request.scope)
+        if retry_after:
+            raise TooManyRequestsError(retry_after=retry_after)
+        return await handler(request)
+
+    return _handler
+
+
+def _get_key_func(key: Union[str, KeyFunc]) -> KeyFunc:
+    if callable(key):
+        return key
+
+    if key == 'ip':
+        def _client_ip(scope: Scope):
+            client = scope.get('client', None)
+            return client[0] if client else ''
+        return _client_ip
+
+    if key.startswith('header:'):
+        header = key[len('header:'):].strip().lower().encode('latin-1')
+
+        def _header_value(scope: Scope):
+            for k, v in scope['headers']:
+                if k == header:
+                    return v.decode('latin-1')
+            return None
+        return _header_value
+
+    raise ValueError(f'Unknown rate limit key "{key}".')
@@ -0,0 +1,56 @@
+import pydantic_core
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from typing import Any, Callable, Mapping, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+__all__ = [
+    'FastJsonResponse',
+    'dump_json',
+]
+
+
+class FastJsonResponse(JSONResponse):
+    """
+    JSON response serializing content straight to bytes.
+
+    With `serializer` (e.g. `dump_json` of a type adapter), content is dumped by it. Otherwise, Pydantic models
+    are dumped by `model_dump_json`, and other content is dumped by orjson when available, falling back to
+    pydantic-core (which handles nested models, dataclasses, datetimes...) for content orjson doesn't
+    support. None of them converts content to a dict first as `jsonable_encoder` does.
+    """
+
+    def __init__(
+            self,
+            content: Any,
+            status_code: int = 200,
+            headers: Optional[Mapping[str, str]] = None,
+            media_type: Optional[str] = None,
+            background: Optional[BackgroundTask] = None,
+            serializer: Optional[Callable[[Any], bytes]] = None,
+    ):
+        self._serializer = serializer
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        if self._serializer is not None:
+            return self._serializer(content)
+        return dump_json(content)
+
+
+def dump_json(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        return content.model_dump_json(by_alias=True).encode('utf-8')
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            pass
+    return pydantic_core.to_json(content)
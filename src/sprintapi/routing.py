@@ -0,0 +1,232 @@
+import re
+
+import fastapi
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import URL
+from starlette.exceptions import HTTPException
+from starlette.responses import PlainTextResponse, RedirectResponse
+from starlette.routing import PARAM_REGEX, BaseRoute, Match, Route, Router, WebSocketRoute, get_route_path
+from starlette.types import Receive, Scope, Send
+from typing import Awaitable, Callable, Optional
+
+
+__all__ = [
+    'CompiledRouter',
+    'RouteHandler',
+    'RouteWrapper',
+    'SprintApiRoute',
+]
+
+
+RouteHandler = Callable[[fastapi.Request], Awaitable[fastapi.Response]]
+RouteWrapper = Callable[['SprintApiRoute', RouteHandler], RouteHandler]
+
+
+class SprintApiRoute(APIRoute):
+    """
+    Route class of controller mappings.
+
+    Each route handler is wrapped by `handler_wrappers` once, when the route is built, so that per-route
+    states (counters, caches, limiters...) are allocated up-front and captured by closures instead of being
+    looked up on every request. The first wrapper is the outermost one.
+
+    Wrappers read SprintAPI route options (e.g. `cache`) of the mapping from `options`.
+    """
+    handler_wrappers: tuple[RouteWrapper, ...] = ()
+
+    @property
+    def options(self) -> dict:
+        return getattr(self.endpoint, '_sprint_api_options', {})
+
+    @classmethod
+    def with_wrappers(cls, *wrappers: RouteWrapper) -> type['SprintApiRoute']:
+        return type(cls.__name__, (cls,), {'handler_wrappers': cls.handler_wrappers + wrappers})
+
+    def get_route_handler(self) -> RouteHandler:
+        handler = super().get_route_handler()
+        for wrapper in reversed(self.handler_wrappers):
+            handler = wrapper(self, handler)
+        return handler
+
+
+# convertors whose values never span several path segments
+_SEGMENT_CONVERTORS = ('str', 'int', 'float', 'uuid')
+
+
+class _Node:
+    __slots__ = ('static', 'params', 'catch_all', 'routes', 'by_method', 'any_method')
+
+    def __init__(self):
+        self.static: dict[str, _Node] = {}
+        # (regex of a full segment, or None for any segment, child)
+        self.params: list[tuple[Optional[re.Pattern], _Node]] = []
+        # routes whose rest of path may span several segments
+        self.catch_all: list[tuple[int, BaseRoute]] = []
+        # routes ending at this node, all of them and by method
+        self.routes: list[tuple[int, BaseRoute]] = []
+        self.by_method: dict[str, list[tuple[int, BaseRoute]]] = {}
+        self.any_method: list[tuple[int, BaseRoute]] = []
+
+    def get_param_child(self, regex: Optional[str]) -> '_Node':
+        pattern = re.compile(regex) if regex is not None else None
+        for p, child in self.params:
+            if p == pattern:
+                return child
+        child = _Node()
+        self.params.append((pattern, child))
+        return child
+
+
+class CompiledRouter:
+    """
+    ASGI app dispatching HTTP requests of a Starlette router through a prefix tree of its routes, installed as the
+    `middleware_stack` of the router.
+
+    The tree is keyed on static path segments, and on typed parameter segments (`{id:int}` only takes digits).
+    Only the routes found in the tree for the request path (and routes the tree can't index, like mounts) are
+    matched, in registration order, so the first matching route wins as with the router itself; route matching
+    still produces the path parameters that FastAPI validates. If routes only match the path with another method,
+    405 is answered with all their methods in `Allow`. Lifespan & WebSocket scopes go to the router unchanged.
+
+    The tree is rebuilt whenever routes are added to the router.
+    """
+
+    def __init__(self, router: Router):
+        self._router = router
+        self._routes: list[BaseRoute] = []
+        self._route_count = -1
+        self._root = _Node()
+        self._others: list[tuple[int, BaseRoute]] = []
+
+    @classmethod
+    def install(cls, router: Router) -> 'CompiledRouter':
+        compiled = cls(router)
+        compiled.compile()
+        router.middleware_stack = compiled
+        return compiled
+
+    def compile(self):
+        self._routes = self._router.routes
+        self._route_count = len(self._routes)
+        self._root = _Node()
+        self._others = []
+        for index, route in enumerate(self._routes):
+            if isinstance(route, Route) and route.path.startswith('/'):
+                self._add(index, route)
+            elif not isinstance(route, WebSocketRoute):
+                self._others.append((index, route))
+
+    def _add(self, index: int, route: Route):
+        entry = (index, route)
+        node = self._root
+        for segment in route.path[1:].split('/'):
+            params = list(PARAM_REGEX.finditer(segment))
+            if not params:
+                node = node.static.setdefault(segment, _Node())
+                continue
+
+            types = [(m.group(2) or ':str')[1:] for m in params]
+            if any(t not in _SEGMENT_CONVERTORS for t in types):
+                node.catch_all.append(entry)
+                return
+            if len(params) == 1 and params[0].group(0) == segment and types[0] != 'str':
+                # a whole segment typed parameter
+                node = node.get_param_child(route.param_convertors[params[0].group(1)].regex)
+            else:
+                node = node.get_param_child(None)
+
+        node.routes.append(entry)
+        if route.methods:
+            for method in route.methods:
+                node.by_method.setdefault(method, []).append(entry)
+        else:
+            node.any_method.append(entry)
+
+    def _lookup(self, path: str, method: Optional[str]) -> list[tuple[int, BaseRoute]]:
+        """
+        Routes which may match the path, with the method or (if None) with any method.
+        """
+        segments = path[1:].split('/')
+        count = len(segments)
+        found = []
+        stack = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node.catch_all:
+                found.append(node.catch_all)
+            if depth == count:
+                if method is None:
+                    entries = node.routes
+                else:
+                    entries = node.by_method.get(method, None)
+                    if node.any_method:
+                        found.append(node.any_method)
+                if entries:
+                    found.append(entries)
+                continue
+
+            segment = segments[depth]
+            child = node.static.get(segment, None)
+            if child is not None:
+                stack.append((child, depth + 1))
+            if segment:
+                for pattern, child in node.params:
+                    if pattern is None or pattern.fullmatch(segment):
+                        stack.append((child, depth + 1))
+
+        if self._others:
+            found.append(self._others)
+        if len(found) == 1:
+            return found[0]
+        return sorted((entry for entries in found for entry in entries), key=_get_index)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        router = self._router
+        if scope['type'] != 'http':
+            await router.app(scope, receive, send)
+            return
+
+        if 'router' not in scope:
+            scope['router'] = router
+        if router.routes is not self._routes or len(self._routes) != self._route_count:
+            self.compile()
+
+        route_path = get_route_path(scope)
+        for _, route in self._lookup(route_path, scope['method']):
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                scope.update(child_scope)
+                await route.handle(scope, receive, send)
+                return
+
+        # routes of the path with other methods
+        allowed = set()
+        for _, route in self._lookup(route_path, None):
+            match, child_scope = route.matches(scope)
+            if match == Match.PARTIAL:
+                allowed.update(route.methods or ())
+        if allowed:
+            headers = {'Allow': ', '.join(sorted(allowed))}
+            if 'app' in scope:
+                raise HTTPException(status_code=405, headers=headers)
+            await PlainTextResponse('Method Not Allowed', status_code=405, headers=headers)(scope, receive, send)
+            return
+
+        if router.redirect_slashes and route_path != '/':
+            redirect_scope = dict(scope)
+            if route_path.endswith('/'):
+                redirect_scope['path'] = redirect_scope['path'].rstrip('/')
+            else:
+                redirect_scope['path'] = redirect_scope['path'] + '/'
+            for _, route in self._lookup(get_route_path(redirect_scope), None):
+                match, _ = route.matches(redirect_scope)
+                if match != Match.NONE:
+                    await RedirectResponse(url=str(URL(scope=redirect_scope)))(scope, receive, send)
+                    return
+
+        await router.default(scope, receive, send)
+
+
+def _get_index(entry: tuple[int, BaseRoute]) -> int:
+    return entry[0]
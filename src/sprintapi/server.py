@@ -1,19 +1,40 @@
+import asyncio
 import logging
+import time
 
 import fastapi
 import importlib.resources
+import os
 import uvicorn
 
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
-from fastapi.staticfiles import StaticFiles
-from typing import Optional
+from fastapi.responses import PlainTextResponse
+from typing import Iterable, Optional, Union
 
-from .config import get_configuration_types
+from .cache import ResponseCacheManager
+from .component import get_component_types
+from .compression import compression_route_wrapper
+from .concurrency import ConcurrencyLimit, concurrency_route_wrapper
+from .config import ConfigReloader, get_configuration_types, set_config_file
 from .controller import get_controller_types
-from .logging import get_sprintapi_logger
-from .middleware import CorsMiddleware
+from .deadline import deadline_route_wrapper
+from .docs import OpenApiDocument, PrecompressedContent, StaticAssets
+from .error import Ok, UnavailableError
+from .logging import flush_async_logging, get_sprintapi_logger
+from .middleware import (
+    CompressionMiddleware,
+    CorsMiddleware,
+    InFlightMiddleware,
+    InFlightTracker,
+    RateLimitMiddleware
+)
+from .metrics import MetricsRegistry, render_counter, render_gauge
 from .middleware.error_handler import register_sprintapi_errors
-from .service import get_service_types
+from .profiler import SamplingProfiler
+from .ratelimit import RateLimit, rate_limit_route_wrapper
+from .routing import CompiledRouter, SprintApiRoute
+from .service import Service, get_service_types
+from .supervisor import WorkerSupervisor
 from .utility.di import DependencyContainer
 
 
@@ -22,6 +43,7 @@ __all__ = ['SprintApiServer']
 
 _logger = get_sprintapi_logger('SprintApiServer')
 _static_dir = importlib.resources.files('sprintapi') / 'static'
+_openapi_url = '/openapi.json'
 
 
 class SprintApiServer(uvicorn.Server):
@@ -35,52 +57,195 @@ class SprintApiServer(uvicorn.Server):
             version: str = None,
             uvicorn_log_level: int = logging.INFO,
             doc_with_google_fonts: bool = True,
+            cors_allow_origins: Iterable[str] = ('*',),
+            cors_allow_methods: Iterable[str] = ('GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'),
+            cors_allow_headers: Iterable[str] = ('Authorization', 'Content-Type'),
+            cors_max_age: int = 600,
+            service_init_timeout: Optional[float] = None,
+            service_start_timeout: Optional[float] = None,
+            service_stop_timeout: Optional[float] = None,
+            workers: int = 1,
+            reuse_port: bool = False,
+            worker_shutdown_timeout: float = 30,
+            enable_metrics: bool = False,
+            metrics_url: str = '/metrics',
+            rate_limit: Optional[RateLimit] = None,
+            concurrency_limit: Optional[ConcurrencyLimit] = None,
+            openapi_cache_dir: Union[str, os.PathLike, None] = None,
+            precompute_openapi: bool = False,
+            enable_compression: bool = False,
+            compression_minimum_size: int = 1024,
+            compression_level: int = 6,
+            compression_brotli_quality: int = 4,
+            config_file: Union[str, os.PathLike, None] = None,
+            config_reload: bool = False,
+            config_watch_interval: Optional[float] = 2,
+            profiler_token: Optional[str] = None,
+            profiler_url: str = '/debug/profile',
+            profiler_max_seconds: float = 60,
+            enable_health: bool = False,
+            health_live_url: str = '/health/live',
+            health_ready_url: str = '/health/ready',
+            shutdown_propagation_delay: float = 0,
+            shutdown_drain_timeout: Optional[float] = 30,
+            compile_routes: bool = True,
     ):
         super().__init__(config=uvicorn.Config(
             app=self._setup_app(app_name, version),
             host=host,
             port=port,
-            log_level=uvicorn_log_level
+            log_level=uvicorn_log_level,
+            timeout_graceful_shutdown=shutdown_drain_timeout
         ))
         self._app_name = app_name
-        self._app.add_middleware(CorsMiddleware)
+        self._workers = workers
+        self._reuse_port = reuse_port
+        self._worker_shutdown_timeout = worker_shutdown_timeout
+        if enable_compression:
+            self._app.add_middleware(
+                CompressionMiddleware,
+                minimum_size=compression_minimum_size,
+                gzip_level=compression_level,
+                brotli_quality=compression_brotli_quality
+            )
+        if rate_limit is not None:
+            self._app.add_middleware(RateLimitMiddleware, limit=rate_limit)
+        self._app.add_middleware(
+            CorsMiddleware,
+            allow_origins=cors_allow_origins,
+            allow_methods=cors_allow_methods,
+            allow_headers=cors_allow_headers,
+            max_age=cors_max_age
+        )
+        self._ready = False
+        self._in_flight = InFlightTracker()
+        self._shutdown_propagation_delay = shutdown_propagation_delay
+        self._shutdown_drain_timeout = shutdown_drain_timeout
+        self._app.add_middleware(
+            InFlightMiddleware,
+            tracker=self._in_flight,
+            exempt_paths=(health_live_url, health_ready_url) if enable_health else ()
+        )
         self._controller_types = get_controller_types()
         self._doc_with_google_fonts = doc_with_google_fonts
 
+        self._metrics = MetricsRegistry()
+        self._metrics.add_collector(self._collect_service_metrics)
+        self._response_caches = ResponseCacheManager()
+
         # component registration
+        if config_file is not None:
+            set_config_file(config_file)
         self._di_container = DependencyContainer()
-        for c in get_configuration_types():
+        self._di_container.register(MetricsRegistry, lambda: self._metrics, is_singleton=True)
+        self._di_container.register(ResponseCacheManager, lambda: self._response_caches, is_singleton=True)
+        config_types = get_configuration_types()
+        for c in config_types:
             self._di_container.register(c, c.load, is_singleton=True)
         for c in self._controller_types:
             self._di_container.register(c, c, is_singleton=True)
+        for c, (scope, pool_size) in get_component_types().items():
+            self._di_container.register(c, c, scope=scope, pool_size=pool_size)
 
         service_types = get_service_types()
         for s in service_types:
             self._di_container.register(s, s, is_singleton=True)
+        self._di_container.compile()
 
-        self._managed_services = self._di_container.resolve_with_order(service_types)
+        self._service_levels = self._di_container.resolve_with_levels(service_types)
+        self._managed_services = [s for level in self._service_levels for s in level]
+        self._service_timeouts = {
+            'init': service_init_timeout,
+            'start': service_start_timeout,
+            'stop': service_stop_timeout,
+        }
+        self._service_timings: dict[str, dict[str, float]] = {}
+        self._config_reloader = ConfigReloader(self._di_container, config_types, config_watch_interval) \
+            if config_reload else None
 
         # register error handlers
         register_sprintapi_errors(self._app)
 
         # bind controllers
+        route_wrappers = []
+        if enable_metrics:
+            route_wrappers.append(self._metrics.route_wrapper)
+        route_wrappers.append(rate_limit_route_wrapper)
+        if concurrency_limit is not None:
+            concurrency_limit.name = concurrency_limit.name or 'global'
+            route_wrappers.append(lambda _, handler: concurrency_limit.wrap(handler))
+        route_wrappers.append(concurrency_route_wrapper)
+        route_wrappers.append(deadline_route_wrapper)
+        route_wrappers.append(self._response_caches.route_wrapper)
+        route_wrappers.append(compression_route_wrapper)
+        route_class = SprintApiRoute.with_wrappers(*route_wrappers)
+
         for c in self._controller_types:
             controller = self._di_container.resolve(c)
-            router = controller.get_router()
+            router = controller.get_router(self._di_container, route_class)
             class_name = controller.__class__.__name__
             self._app.include_router(router)
             _logger.info(f'Bind controller {class_name} with route prefix "{router.prefix}".')
 
-        # bind static files
-        self._app.mount('/static', StaticFiles(directory=_static_dir), name='static')
+        self._concurrency_limits = [concurrency_limit] if concurrency_limit is not None else []
+        for route in self._app.routes:
+            limit = route.options.get('concurrency_limit', None) if isinstance(route, SprintApiRoute) else None
+            if limit is not None and limit not in self._concurrency_limits:
+                self._concurrency_limits.append(limit)
+        self._metrics.add_collector(self._collect_concurrency_metrics)
+
+        # bind static files & docs, all served from memory
+        self._static_assets = StaticAssets(_static_dir)
+        self._app.mount('/static', self._static_assets, name='static')
+        self._openapi = OpenApiDocument(self._app, openapi_cache_dir)
+        self._app.add_route(_openapi_url, self._openapi.endpoint, methods=['GET', 'HEAD'], include_in_schema=False)
         if enable_docs:
-            self._app.get('/docs', include_in_schema=False)(self._swagger_ui_html)
-            self._app.get('/redoc', include_in_schema=False)(self._redoc_ui_html)
+            self._swagger_ui_page = PrecompressedContent(self._swagger_ui_html().body, 'text/html; charset=utf-8')
+            self._redoc_ui_page = PrecompressedContent(self._redoc_ui_html().body, 'text/html; charset=utf-8')
+            self._app.add_route('/docs', self._swagger_ui_endpoint, methods=['GET', 'HEAD'], include_in_schema=False)
+            self._app.add_route('/redoc', self._redoc_ui_endpoint, methods=['GET', 'HEAD'], include_in_schema=False)
+            self._static_assets.preload()
+        if enable_metrics:
+            self._app.get(metrics_url, include_in_schema=False)(self._metrics_text)
+        if enable_health:
+            self._app.get(health_live_url, include_in_schema=False)(self._health_live)
+            self._app.get(health_ready_url, include_in_schema=False)(self._health_ready)
+        if profiler_token is not None:
+            self._profiler = SamplingProfiler(profiler_token, profiler_max_seconds)
+            self._app.add_route(profiler_url, self._profiler.endpoint, methods=['GET'], include_in_schema=False)
+
+        # dispatch through a prefix tree of the routes, instead of matching them one by one
+        if compile_routes:
+            CompiledRouter.install(self._app.router)
+
+        # generate (or load) the schema before workers are forked
+        if precompute_openapi or openapi_cache_dir is not None:
+            self._openapi.load()
 
     @property
     def app(self):
         return self._app
 
+    @property
+    def openapi(self) -> OpenApiDocument:
+        return self._openapi
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def run(self, sockets = None):
+        if self._workers <= 1 or sockets is not None:
+            return super().run(sockets)
+
+        WorkerSupervisor(
+            self.config,
+            super().run,
+            workers=self._workers,
+            reuse_port=self._reuse_port,
+            shutdown_timeout=self._worker_shutdown_timeout
+        ).run()
+
     async def startup(self, sockets = None):
         await self._pre_startup()
         await super().startup(sockets)
@@ -90,9 +255,54 @@ class SprintApiServer(uvicorn.Server):
         await super().shutdown(sockets)
         await self._post_shutdown()
 
+    def _collect_service_metrics(self):
+        return render_gauge(
+            'sprintapi_service_lifecycle_seconds',
+            'Duration of the last service lifecycle phase.',
+            (
+                ({'service': name, 'phase': phase}, elapsed)
+                for name, timings in self._service_timings.items()
+                for phase, elapsed in timings.items()
+            )
+        )
+
+    def _collect_concurrency_metrics(self):
+        for key, description in (
+            ('limit', 'Current adaptive concurrency limit.'),
+            ('in_flight', 'Requests holding a concurrency slot.'),
+            ('queued', 'Requests waiting for a concurrency slot.'),
+        ):
+            yield from render_gauge(
+                f'sprintapi_concurrency_{key}',
+                description,
+                (({'limiter': limit.name}, limit.snapshot()[key]) for limit in self._concurrency_limits)
+            )
+        yield from render_counter(
+            'sprintapi_concurrency_shed_total',
+            'Requests shed by the concurrency limiter.',
+            (({'limiter': limit.name}, limit.shed) for limit in self._concurrency_limits)
+        )
+
+    def _health_live(self):
+        return Ok()
+
+    def _health_ready(self):
+        if not self._ready:
+            raise UnavailableError('Server is not ready.')
+        return Ok()
+
+    def _metrics_text(self):
+        return PlainTextResponse(self._metrics.render(), media_type='text/plain; version=0.0.4')
+
+    async def _redoc_ui_endpoint(self, request: fastapi.Request):
+        return self._redoc_ui_page.get_response(request.headers, head=request.method == 'HEAD')
+
+    async def _swagger_ui_endpoint(self, request: fastapi.Request):
+        return self._swagger_ui_page.get_response(request.headers, head=request.method == 'HEAD')
+
     def _redoc_ui_html(self):
         return get_redoc_html(
-            openapi_url=self._app.openapi_url,
+            openapi_url=_openapi_url,
             title=f'{self._app_name} - Redoc' if self._app_name else 'Redoc',
             redoc_js_url='/static/redoc/redoc.standalone.js',
             with_google_fonts=self._doc_with_google_fonts
@@ -100,7 +310,7 @@ class SprintApiServer(uvicorn.Server):
 
     def _swagger_ui_html(self):
         return get_swagger_ui_html(
-            openapi_url=self._app.openapi_url,
+            openapi_url=_openapi_url,
             title=f'{self._app_name} - Swagger UI' if self._app_name else 'Swagger UI',
             swagger_favicon_url='/static/swagger-ui/favicon-32x32.png',
             swagger_js_url='/static/swagger-ui/swagger-ui-bundle.js',
@@ -108,23 +318,69 @@ class SprintApiServer(uvicorn.Server):
         )
 
     async def _pre_startup(self):
-        # init services
-        for s in self._managed_services:
-            await s.init()
-        _logger.info('Managers init complete.')
+        # init & start services, services in the same dependency level run concurrently
+        elapsed = await self._run_service_phase('init', self._service_levels)
+        _logger.info(f'Managers init complete in {elapsed * 1000:.1f} ms.')
+
+        elapsed = await self._run_service_phase('start', self._service_levels)
+        _logger.info(f'Managers start complete in {elapsed * 1000:.1f} ms.')
 
-        # start services
-        for s in self._managed_services:
-            await s.start()
-        _logger.info('Managers start complete.')
+        if self._config_reloader is not None:
+            await self._config_reloader.start()
+        self._ready = True
 
     async def _pre_shutdown(self):
-        pass
+        # fail readiness, and keep serving until load balancers notice it
+        self._ready = False
+        if self._shutdown_propagation_delay > 0:
+            _logger.info(f'Not ready, wait {self._shutdown_propagation_delay} s before draining.')
+            await asyncio.sleep(self._shutdown_propagation_delay)
+
+        # reject new requests, and wait for in-flight ones before services stop
+        in_flight = self._in_flight.in_flight
+        begin = time.perf_counter()
+        if await self._in_flight.wait_drained(self._shutdown_drain_timeout):
+            _logger.info(f'Drained {in_flight} in-flight requests in {(time.perf_counter() - begin) * 1000:.1f} ms.')
+        else:
+            _logger.warning(f'{self._in_flight.in_flight} requests still in flight after '
+                            f'{self._shutdown_drain_timeout} s drain timeout.')
 
     async def _post_shutdown(self):
-        for s in self._managed_services[::-1]:
-            await s.stop()
-        _logger.info('Managers stop complete.')
+        if self._config_reloader is not None:
+            await self._config_reloader.stop()
+        elapsed = await self._run_service_phase('stop', self._service_levels[::-1], raise_errors=False)
+        _logger.info(f'Managers stop complete in {elapsed * 1000:.1f} ms.')
+        flush_async_logging()
+
+    async def _run_service_phase(self, phase: str, levels: list[list[Service]], raise_errors: bool = True):
+        begin = time.perf_counter()
+        for level in levels:
+            results = await asyncio.gather(
+                *(self._run_service_lifecycle(s, phase) for s in level),
+                return_exceptions=True
+            )
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if not errors:
+                continue
+            if raise_errors:
+                raise errors[0]
+            for e in errors:
+                _logger.error(f'Service {phase} failed: {e!r}')
+        return time.perf_counter() - begin
+
+    async def _run_service_lifecycle(self, s: Service, phase: str):
+        name = s.__class__.__name__
+        timeout = self._service_timeouts[phase]
+
+        begin = time.perf_counter()
+        try:
+            await asyncio.wait_for(getattr(s, phase)(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f'Service "{name}" {phase} timed out after {timeout} seconds.')
+        elapsed = time.perf_counter() - begin
+
+        self._service_timings.setdefault(name, {})[phase] = elapsed
+        _logger.info(f'Service {name} {phase} took {elapsed * 1000:.1f} ms.')
 
     def _setup_app(self, app_name: Optional[str], version: Optional[str]):
         extra_args = {}
@@ -132,5 +388,5 @@ class SprintApiServer(uvicorn.Server):
             extra_args['title'] = app_name
         if version:
             extra_args['version'] = version
-        self._app = fastapi.FastAPI(docs_url=None, redoc_url=None, **extra_args)
+        self._app = fastapi.FastAPI(docs_url=None, redoc_url=None, openapi_url=None, **extra_args)
         return self._app
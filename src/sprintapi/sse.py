@@ -0,0 +1,186 @@
+import asyncio
+
+import fastapi
+
+from starlette.background import BackgroundTask
+from starlette.types import Receive, Scope, Send
+from typing import Any, AsyncIterator, Mapping, Optional
+
+from .error import Error, InternalError
+from .logging import get_sprintapi_logger
+from .middleware.error_handler import render_error
+from .response import dump_json
+
+
+__all__ = [
+    'EventStreamResponse',
+    'ServerSentEvent',
+    'encode_event',
+]
+
+
+_logger = get_sprintapi_logger('EventStream')
+
+_HEARTBEAT = b': ping\n\n'
+
+
+class ServerSentEvent:
+    """
+    An event with fields other than `data`. Data is sent as is if it's `str` or `bytes`, otherwise dumped as JSON.
+    """
+    __slots__ = ('data', 'event', 'id', 'retry')
+
+    def __init__(
+            self,
+            data: Any = None,
+            event: Optional[str] = None,
+            id: Optional[str] = None,
+            retry: Optional[int] = None,
+    ):
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+
+    def encode(self) -> bytes:
+        fields = []
+        if self.event is not None:
+            fields.append(b'event: ' + self.event.encode('utf-8') + b'\n')
+        if self.id is not None:
+            fields.append(b'id: ' + self.id.encode('utf-8') + b'\n')
+        if self.retry is not None:
+            fields.append(b'retry: ' + str(self.retry).encode('ascii') + b'\n')
+        fields.append(_encode_data(self.data))
+        fields.append(b'\n')
+        return b''.join(fields)
+
+
+def encode_event(item: Any) -> bytes:
+    """
+    Frame an item yielded by an SSE mapping as an event.
+    """
+    if isinstance(item, ServerSentEvent):
+        return item.encode()
+    return _encode_data(item) + b'\n'
+
+
+def _encode_data(data: Any) -> bytes:
+    if data is None:
+        return b'data: \n'
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    elif not isinstance(data, (bytes, bytearray)):
+        data = dump_json(data)
+
+    # JSON & single line text, which is the common case, needs no split
+    if b'\n' not in data and b'\r' not in data:
+        return b'data: ' + data + b'\n'
+    return b''.join(b'data: ' + line + b'\n' for line in data.splitlines())
+
+
+class EventStreamResponse(fastapi.Response):
+    """
+    Streams the events of an async iterator.
+
+    Events are produced into a queue of at most `max_pending` framed events, so a slow client holds the
+    iterator back instead of growing the buffer. The writer coalesces the events produced within
+    `coalesce_window` seconds into one write, and sends a keep-alive comment after `heartbeat` seconds
+    without events. On client disconnect, the iterator is closed right away.
+
+    Errors raised by the iterator end the stream with an `abort` event, same as the error handler does.
+    """
+    media_type = 'text/event-stream'
+
+    def __init__(
+            self,
+            content: AsyncIterator,
+            status_code: int = 200,
+            headers: Optional[Mapping[str, str]] = None,
+            background: Optional[BackgroundTask] = None,
+            heartbeat: Optional[float] = 15,
+            coalesce_window: float = 0.01,
+            max_pending: int = 64,
+    ):
+        self.body_iterator = content
+        self.status_code = status_code
+        self.background = background
+        self.init_headers(headers)
+        self.raw_headers.append((b'cache-control', b'no-cache'))
+        # tell reverse proxies (nginx) not to buffer the stream
+        self.raw_headers.append((b'x-accel-buffering', b'no'))
+
+        self._heartbeat = heartbeat
+        self._coalesce_window = coalesce_window
+        self._max_pending = max_pending
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        queue = asyncio.Queue(self._max_pending)
+        producer = asyncio.create_task(self._produce(queue))
+        watcher = asyncio.create_task(_wait_disconnect(receive))
+        writer = None
+        completed = False
+
+        try:
+            await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+            writer = asyncio.create_task(self._write(queue, send))
+            await asyncio.wait((writer, watcher), return_when=asyncio.FIRST_COMPLETED)
+            completed = writer.done() and not writer.cancelled() and writer.result()
+        except OSError:
+            pass
+        finally:
+            tasks = [t for t in (producer, watcher, writer) if t is not None]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if completed and self.background is not None:
+            await self.background()
+
+    async def _produce(self, queue: asyncio.Queue):
+        iterator = self.body_iterator
+        try:
+            async for item in iterator:
+                await queue.put(encode_event(item))
+        except Error as e:
+            await queue.put(render_error(e, event_stream=True).body)
+        except Exception:
+            _logger.exception('Event stream failed.')
+            await queue.put(render_error(InternalError(), event_stream=True).body)
+        finally:
+            # the iterator is suspended at `yield` when cancelled, close it to stop its work
+            aclose = getattr(iterator, 'aclose', None)
+            if aclose is not None:
+                await aclose()
+        await queue.put(None)
+
+    async def _write(self, queue: asyncio.Queue, send: Send) -> bool:
+        heartbeat = self._heartbeat
+        coalesce_window = self._coalesce_window
+
+        while True:
+            try:
+                chunk = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                await send({'type': 'http.response.body', 'body': _HEARTBEAT, 'more_body': True})
+                continue
+
+            chunks = [chunk]
+            if chunk is not None:
+                if coalesce_window > 0:
+                    await asyncio.sleep(coalesce_window)
+                while chunks[-1] is not None and not queue.empty():
+                    chunks.append(queue.get_nowait())
+
+            end = chunks[-1] is None
+            if end:
+                chunks.pop()
+            await send({'type': 'http.response.body', 'body': b''.join(chunks), 'more_body': not end})
+            if end:
+                return True
+
+
+async def _wait_disconnect(receive: Receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
@@ -0,0 +1,150 @@
+import os
+import signal
+import socket
+import time
+import traceback
+
+import uvicorn
+
+from typing import Callable, Optional
+
+from .logging import get_sprintapi_logger
+
+
+__all__ = ['WorkerSupervisor']
+
+
+_logger = get_sprintapi_logger('WorkerSupervisor')
+
+_HANDLED_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+# forwarded to workers without stopping them, e.g. SIGHUP to reload configurations
+_FORWARDED_SIGNALS = (signal.SIGHUP,) if hasattr(signal, 'SIGHUP') else ()
+
+
+class WorkerSupervisor:
+    """
+    Pre-fork supervisor running a server in multiple worker processes.
+
+    The listening socket is either bound once and inherited by every worker, or (with `reuse_port`) bound by
+    each worker with `SO_REUSEPORT` so that the kernel balances connections among them. Workers are forked
+    from the fully constructed server, hence each worker owns a copy of the DI container and runs the service
+    lifecycle on its own event loop.
+
+    Crashed workers are restarted; `SIGINT`/`SIGTERM` are forwarded to all workers for a graceful shutdown,
+    and workers still alive after `shutdown_timeout` seconds are killed. `SIGHUP` is forwarded as well.
+    """
+
+    def __init__(
+            self,
+            config: uvicorn.Config,
+            run_worker: Callable[[list[socket.socket]], None],
+            workers: int,
+            reuse_port: bool = False,
+            shutdown_timeout: float = 30,
+    ):
+        if not hasattr(os, 'fork'):
+            raise RuntimeError('Multi-process worker mode requires os.fork().')
+
+        self._config = config
+        self._run_worker = run_worker
+        self._workers = workers
+        self._reuse_port = reuse_port
+        self._shutdown_timeout = shutdown_timeout
+
+        self._sock: Optional[socket.socket] = None
+        self._pids: dict[int, int] = {}
+        self._should_exit = False
+
+    def run(self):
+        if not self._reuse_port:
+            self._sock = self._config.bind_socket()
+
+        original_handlers = {sig: signal.signal(sig, self._handle_exit) for sig in _HANDLED_SIGNALS}
+        original_handlers.update({sig: signal.signal(sig, self._forward) for sig in _FORWARDED_SIGNALS})
+        try:
+            for slot in range(self._workers):
+                self._spawn(slot)
+            _logger.info(f'Started {self._workers} workers.')
+
+            self._supervise()
+        finally:
+            for sig, handler in original_handlers.items():
+                signal.signal(sig, handler)
+            if self._sock is not None:
+                self._sock.close()
+
+        _logger.info('All workers stopped.')
+
+    def _bind_reuse_port_socket(self) -> socket.socket:
+        family = socket.AF_INET6 if ':' in self._config.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self._config.host, self._config.port))
+        sock.listen(self._config.backlog)
+        sock.set_inheritable(True)
+        return sock
+
+    def _handle_exit(self, sig: int, frame):
+        self._should_exit = True
+        self._forward(sig, frame)
+
+    def _forward(self, sig: int, _):
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def _spawn(self, slot: int):
+        pid = os.fork()
+        if pid != 0:
+            self._pids[pid] = slot
+            return
+
+        # worker process, never returns
+        exit_code = 0
+        try:
+            for sig in _HANDLED_SIGNALS:
+                signal.signal(sig, signal.SIG_DFL)
+            # ignored unless the worker handles it
+            for sig in _FORWARDED_SIGNALS:
+                signal.signal(sig, signal.SIG_IGN)
+            sock = self._sock if self._sock is not None else self._bind_reuse_port_socket()
+            self._run_worker([sock])
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _supervise(self):
+        deadline = None
+
+        while self._pids:
+            if self._should_exit and deadline is None:
+                deadline = time.monotonic() + self._shutdown_timeout
+
+            if deadline is not None and time.monotonic() > deadline:
+                _logger.error(f'Killing {len(self._pids)} workers, shutdown timeout exceeded.')
+                for pid in self._pids:
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        # exited meanwhile, reaped below
+                        pass
+                deadline = float('inf')
+
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.1)
+                continue
+
+            slot = self._pids.pop(pid, None)
+            if slot is None or self._should_exit:
+                continue
+
+            _logger.error(f'Worker {pid} exited unexpectedly with status {status}, restarting.')
+            time.sleep(1)
+            if not self._should_exit:
+                self._spawn(slot)
@@ -0,0 +1,111 @@
+import asyncio
+
+from starlette.types import ASGIApp, Message
+from typing import Iterable, Optional, Union
+
+
+__all__ = [
+    'AsgiClient',
+    'AsgiResponse',
+]
+
+
+class AsgiResponse:
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status: int, headers: list[tuple[bytes, bytes]], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def get_header(self, name: str) -> Optional[str]:
+        key = name.lower().encode('latin-1')
+        for k, v in self.headers:
+            if k == key:
+                return v.decode('latin-1')
+        return None
+
+
+class AsgiClient:
+    """
+    Minimal HTTP client calling an ASGI app in-process, without sockets, for benchmarks and load generation.
+
+    Unlike `TestClient`, it runs on the caller's event loop and builds nothing but the ASGI messages, so the
+    client overhead stays small compared to the app.
+    """
+
+    def __init__(self, app: ASGIApp, host: str = 'localhost', client: tuple[str, int] = ('127.0.0.1', 50000)):
+        self.app = app
+        self._host = host.encode('latin-1')
+        self._client = client
+
+    async def request(
+            self,
+            method: str,
+            path: str,
+            query_string: Union[str, bytes] = b'',
+            headers: Iterable[tuple[Union[str, bytes], Union[str, bytes]]] = (),
+            body: bytes = b'',
+    ) -> AsgiResponse:
+        if isinstance(query_string, str):
+            query_string = query_string.encode('latin-1')
+        raw_headers = [(b'host', self._host)]
+        for k, v in headers:
+            raw_headers.append((
+                (k.encode('latin-1') if isinstance(k, str) else k).lower(),
+                v.encode('latin-1') if isinstance(v, str) else v,
+            ))
+        if body:
+            raw_headers.append((b'content-length', str(len(body)).encode('latin-1')))
+
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode('utf-8'),
+            'root_path': '',
+            'query_string': query_string,
+            'headers': raw_headers,
+            'client': self._client,
+            'server': ('localhost', 80),
+        }
+
+        request_sent = False
+        response_complete = asyncio.Event()
+        status = 0
+        response_headers = []
+        chunks = []
+
+        async def receive() -> Message:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            # streaming apps watch for disconnect, which only happens once the response is complete
+            await response_complete.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message: Message):
+            nonlocal status, response_headers
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                response_headers = message.get('headers', [])
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+                if not message.get('more_body', False):
+                    response_complete.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            response_complete.set()
+        return AsgiResponse(status, list(response_headers), b''.join(chunks))
+
+    async def get(self, path: str, **kwargs) -> AsgiResponse:
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> AsgiResponse:
+        return await self.request('POST', path, **kwargs)
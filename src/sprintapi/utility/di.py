@@ -1,95 +1,145 @@
+import contextlib
+import contextvars
 import inspect
-from collections import defaultdict, deque
-from typing import Any, Callable, Iterable, get_type_hints
+from collections import deque
+from typing import Any, Callable, Iterable, Optional, get_type_hints
+
+from ..logging import get_sprintapi_logger
 
 
 __all__ = ['DependencyContainer']
 
 
+_logger = get_sprintapi_logger('DependencyContainer')
+
+_SCOPES = ('singleton', 'transient', 'request')
+
+_request_instances: contextvars.ContextVar[Optional[dict[type, object]]] = contextvars.ContextVar(
+    'sprintapi_request_instances',
+    default=None
+)
+
+
 class DependencyContainer:
     def __init__(self):
-        self._components: dict[type, tuple[Callable, bool]] = {}
+        self._components: dict[type, tuple[Callable, str]] = {}
         self._singletons: dict[type, object] = {}
+        self._pools: dict[type, deque] = {}
 
-    def check_circular(self):
-        # build indegree map with all related deps
-        indegree_map = self._build_indegree_map(self._components.keys())
+        # compiled states, reset on registration
+        self._type_hints: dict[type, dict[str, type]] = {}
+        self._plans: dict[type, Callable[[], Any]] = {}
+        self._order: Optional[list[type]] = None
 
-        unresolved = deque([c for c, count in indegree_map.items() if count == 0])
-        visit_count = 0
+    def check_circular(self):
+        _, cycle = self._sort_components(self._components.keys())
+        return cycle is not None
 
-        while unresolved:
-            interface = unresolved.popleft()
-            visit_count += 1
+    def compile(self):
+        """
+        Build the resolution plan of every registered component.
 
-            deps = list(self._get_direct_deps(interface).values())
-            for dep in deps:
-                indegree_map[dep] -= 1
-                if indegree_map[dep] == 0:
-                    unresolved.append(dep)
+        Type hints are collected once, cycles are detected once with a readable path, and each interface gets
+        a flat factory closure, so that `resolve` afterward does not involve any reflection.
+        """
+        self._order = self._build_plans(self._components.keys())
 
-        return visit_count != len(indegree_map)
+    def get_dependents(self, interface: type) -> list[type]:
+        """
+        Get the registered interfaces depending directly on the interface.
+        """
+        return [i for i in self._components if interface in self._get_direct_deps(i).values()]
 
-    def register(self, interface: type[object], impl: Callable, is_singleton: bool = False):
-        if interface in self._components:
-            raise TypeError(f'Type "{interface.__name__}" already registered."')
-        self._components[interface] = (impl, is_singleton)
+    def get_instance(self, interface: type) -> Optional[object]:
+        """
+        Get the singleton instance of the interface if it's already created, without creating it.
+        """
+        return self._singletons.get(interface, None)
 
-    def resolve(self, interface: type):
-        deps = self._get_direct_deps(interface)
-        dep_impls = {k: self.resolve(v) for k, v in deps.items()}
+    def get_scope(self, interface: type) -> Optional[str]:
         impl_info = self._components.get(interface, None)
+        return impl_info[1] if impl_info else None
 
-        if impl_info is None:
-            raise TypeError(f'Failed to resolve dependency of type: "{interface.__name__}".')
+    def register(
+            self,
+            interface: type[object],
+            impl: Callable,
+            is_singleton: bool = False,
+            scope: Optional[str] = None,
+            pool_size: int = 0,
+    ):
+        """
+        Register a component.
 
-        impl, is_singleton = impl_info
-        if is_singleton:
-            if interface not in self._singletons:
-                self._singletons[interface] = self._create_impl(interface, impl, dep_impls)
-            return self._singletons[interface]
-        return self._create_impl(interface, impl, dep_impls)
+        `scope` is one of `singleton`, `transient` or `request`, and defaults to `singleton` or `transient`
+        depending on `is_singleton`. A request-scoped component is created at most once per request scope,
+        and disposed (`aclose()` or `close()`) when the scope ends; with `pool_size`, up to that many
+        instances are kept (after an optional `reset()`) and reused by later scopes instead, hence a pooled
+        component cannot depend on other request-scoped components.
+        """
+        if interface in self._components:
+            raise TypeError(f'Type "{interface.__name__}" already registered."')
 
-    def resolve_with_order(self, interfaces: Iterable[type]) -> list[Any]:
-        target_interfaces = set(interfaces)
+        if scope is None:
+            scope = 'singleton' if is_singleton else 'transient'
+        if scope not in _SCOPES:
+            raise ValueError(f'Unknown scope "{scope}" of type "{interface.__name__}".')
 
-        # find all related interfaces along the path
-        related_interfaces = set()
-        unresolved = deque(target_interfaces)
+        self._components[interface] = (impl, scope)
+        if scope == 'request' and pool_size > 0:
+            self._pools[interface] = deque(maxlen=pool_size)
+        self._plans.clear()
+        self._order = None
 
-        while unresolved:
-            interface = unresolved.popleft()
-            related_interfaces.add(interface)
-            for dep in self._get_direct_deps(interface).values():
-                if dep not in related_interfaces:
-                    unresolved.append(dep)
+    @contextlib.asynccontextmanager
+    async def request_scope(self):
+        """
+        Open a request scope, in which request-scoped components are created once and then reused.
+        """
+        instances: dict[type, object] = {}
+        token = _request_instances.set(instances)
+        try:
+            yield
+        finally:
+            try:
+                _request_instances.reset(token)
+            except ValueError as e:
+                # exited in another context than entered, instances are released anyway
+                _logger.error(f'Failed to reset request scope: {e!r}')
+            await self._release(instances)
 
-        indegree_map = self._build_indegree_map(related_interfaces)
+    def resolve(self, interface: type):
+        return self._get_plan(interface)()
 
-        # start from no deps, simulate population, append node only if indegree depleted (Kahn's algo)
-        unresolved = deque([c for c, count in indegree_map.items() if count == 0])
-        res_interfaces = []
+    def resolve_with_order(self, interfaces: Iterable[type]) -> list[Any]:
+        target_interfaces = self._get_targets(interfaces)
+        return [self.resolve(interface) for interface in self._get_order() if interface in target_interfaces]
 
-        while unresolved:
-            interface = unresolved.popleft()
+    def resolve_with_levels(self, interfaces: Iterable[type]) -> list[list[Any]]:
+        """
+        Resolve interfaces grouped into dependency levels.
 
-            if interface in target_interfaces:
-                res_interfaces.append(interface)
+        Every interface in a level only depends (directly or through non-target components) on interfaces
+        of previous levels, so interfaces of the same level can be handled concurrently.
+        """
+        target_interfaces = self._get_targets(interfaces)
 
+        # count only target interfaces along the longest dependency path
+        depth_map: dict[type, int] = {}
+        levels: list[list[Any]] = []
+
+        for interface in self._get_order():
+            depth = 0
             for dep in self._get_direct_deps(interface).values():
-                indegree_map[dep] -= 1
-                if indegree_map[dep] == 0:
-                    unresolved.append(dep)
+                depth = max(depth, depth_map[dep] + (1 if dep in target_interfaces else 0))
+            depth_map[interface] = depth
 
-        return [self.resolve(interface) for interface in res_interfaces[::-1]]
+            if interface in target_interfaces:
+                while len(levels) <= depth:
+                    levels.append([])
+                levels[depth].append(self.resolve(interface))
 
-    def _build_indegree_map(self, interfaces: Iterable[type]) -> dict[type, int]:
-        indegree_map = defaultdict(int)
-        for c in interfaces:
-            indegree_map[c] += 0
-            for dep in self._get_direct_deps(c).values():
-                indegree_map[dep] += 1
-        return indegree_map
+        return [level for level in levels if level]
 
     @staticmethod
     def _create_impl(interface, impl, deps):
@@ -98,7 +148,82 @@ class DependencyContainer:
         except TypeError:
             raise TypeError(f'Failed to resolve dependency of type: "{interface.__name__}".')
 
+    def _build_plan(self, interface: type) -> Callable[[], Any]:
+        impl, scope = self._components[interface]
+        deps = self._get_direct_deps(interface)
+
+        if scope == 'singleton' or interface in self._pools:
+            # singletons & pooled instances outlive the request-scoped instances they were created with
+            dep = self._find_request_scoped_dep(interface)
+            if dep is not None:
+                kind = 'Singleton' if scope == 'singleton' else 'Pooled'
+                raise TypeError(
+                    f'{kind} type "{interface.__name__}" cannot depend on request-scoped type "{dep.__name__}".'
+                )
+
+        dep_plans = tuple((name, self._plans[dep]) for name, dep in deps.items())
+        create_impl = self._create_impl
+
+        def _create():
+            return create_impl(interface, impl, {name: plan() for name, plan in dep_plans})
+
+        if scope == 'transient':
+            return _create
+
+        if scope == 'singleton':
+            singletons = self._singletons
+
+            def _get_singleton():
+                if interface not in singletons:
+                    singletons[interface] = _create()
+                return singletons[interface]
+
+            return _get_singleton
+
+        pool = self._pools.get(interface, None)
+
+        def _get_scoped():
+            instances = _request_instances.get()
+            if instances is None:
+                raise TypeError(f'Request-scoped type "{interface.__name__}" is resolved out of a request scope.')
+            if interface not in instances:
+                instances[interface] = pool.pop() if pool else _create()
+            return instances[interface]
+
+        return _get_scoped
+
+    def _build_plans(self, interfaces: Iterable[type]) -> list[type]:
+        order, cycle = self._sort_components(interfaces)
+        if cycle is not None:
+            raise TypeError(f'Circular dependency detected: {" -> ".join(c.__name__ for c in cycle)}.')
+
+        # dependencies come first, hence their plans are always ready when building the dependents
+        for interface in order:
+            if interface not in self._plans:
+                self._plans[interface] = self._build_plan(interface)
+        return order
+
+    def _find_request_scoped_dep(self, interface: type) -> Optional[type]:
+        # through transient dependencies, which are created along with the instance
+        pending = list(self._get_direct_deps(interface).values())
+        seen = set()
+        while pending:
+            dep = pending.pop()
+            if dep in seen:
+                continue
+            seen.add(dep)
+            scope = self._components[dep][1]
+            if scope == 'request':
+                return dep
+            if scope == 'transient':
+                pending.extend(self._get_direct_deps(dep).values())
+        return None
+
     def _get_direct_deps(self, interface: type) -> dict[str, type]:
+        type_hints = self._type_hints.get(interface, None)
+        if type_hints is not None:
+            return type_hints
+
         impl_info = self._components.get(interface, None)
         if not impl_info:
             raise TypeError(f'Failed to resolve dependency of type: "{interface.__name__}".')
@@ -109,4 +234,84 @@ class DependencyContainer:
         else:
             type_hints = get_type_hints(impl_sig)
 
-        return { name: pt for name, pt in type_hints.items() if name != 'return' }
+        type_hints = { name: pt for name, pt in type_hints.items() if name != 'return' }
+        self._type_hints[interface] = type_hints
+        return type_hints
+
+    def _get_order(self) -> list[type]:
+        if self._order is None:
+            self.compile()
+        return self._order
+
+    def _get_plan(self, interface: type) -> Callable[[], Any]:
+        plan = self._plans.get(interface, None)
+        if plan is None:
+            self._build_plans((interface,))
+            plan = self._plans[interface]
+        return plan
+
+    def _get_targets(self, interfaces: Iterable[type]) -> set[type]:
+        target_interfaces = set(interfaces)
+        for interface in target_interfaces:
+            if interface not in self._components:
+                raise TypeError(f'Failed to resolve dependency of type: "{interface.__name__}".')
+        return target_interfaces
+
+    async def _release(self, instances: dict[type, object]):
+        # dependents are created after their dependencies, hence released in reverse order
+        for interface, instance in reversed(instances.items()):
+            try:
+                pool = self._pools.get(interface, None)
+                if pool is not None and len(pool) < pool.maxlen:
+                    await _call_optional(instance, 'reset')
+                    pool.append(instance)
+                elif not await _call_optional(instance, 'aclose'):
+                    await _call_optional(instance, 'close')
+            except Exception as e:
+                _logger.error(f'Failed to release request-scoped "{interface.__name__}": {e!r}')
+
+    def _sort_components(self, interfaces: Iterable[type]) -> tuple[list[type], Optional[list[type]]]:
+        """
+        Depth-first topological sort, dependencies come before their dependents.
+
+        Returns the sorted interfaces and the first cycle found (as a path ending with its first node), if any.
+        """
+        order: list[type] = []
+        done: set[type] = set()
+        visiting: set[type] = set()
+
+        for root in interfaces:
+            if root in done:
+                continue
+
+            visiting.add(root)
+            stack = [(root, iter(self._get_direct_deps(root).values()))]
+
+            while stack:
+                interface, deps = stack[-1]
+                for dep in deps:
+                    if dep in visiting:
+                        path = [i for i, _ in stack]
+                        return order, path[path.index(dep):] + [dep]
+                    if dep not in done:
+                        visiting.add(dep)
+                        stack.append((dep, iter(self._get_direct_deps(dep).values())))
+                        break
+                else:
+                    stack.pop()
+                    visiting.remove(interface)
+                    done.add(interface)
+                    order.append(interface)
+
+        return order, None
+
+
+async def _call_optional(instance: object, method_name: str) -> bool:
+    method = getattr(instance, method_name, None)
+    if method is None:
+        return False
+
+    res = method()
+    if inspect.isawaitable(res):
+        await res
+    return True
@@ -0,0 +1,54 @@
+from types import FrameType
+from typing import Optional
+
+
+__all__ = [
+    'get_frame_label',
+    'get_frame_owner',
+]
+
+
+def get_frame_owner(frame: Optional[FrameType]) -> Optional[str]:
+    """
+    Get the innermost controller mapping (as `METHOD /route`) or service method (as `Service.method`) running in
+    the stack ending with the frame, found by the `self` of each frame.
+    """
+    while frame is not None:
+        label = _get_component_label(frame)
+        if label is not None:
+            return label
+        frame = frame.f_back
+    return None
+
+
+def get_frame_label(frame: FrameType) -> str:
+    """
+    Label of a frame in collapsed stacks, controller mappings are labeled by route.
+    """
+    label = _get_component_label(frame)
+    if label is not None:
+        return label
+    code = frame.f_code
+    return f'{frame.f_globals.get("__name__", "?")}:{code.co_qualname if hasattr(code, "co_qualname") else code.co_name}'
+
+
+def _get_component_label(frame: FrameType) -> Optional[str]:
+    # imported here, since controllers & services import utilities
+    from ..controller import Controller
+    from ..service import Service
+
+    code = frame.f_code
+    if not code.co_argcount or code.co_varnames[0] != 'self':
+        return None
+    owner = frame.f_locals.get('self', None)
+
+    if isinstance(owner, Controller):
+        method = getattr(type(owner), code.co_name, None)
+        api_type = getattr(method, '_sprint_api_type', None)
+        if api_type is not None:
+            return f'{api_type} {getattr(owner, "_sprint_api_route", "")}{method._sprint_api_route}'
+        return f'{type(owner).__name__}.{code.co_name}'
+
+    if isinstance(owner, Service):
+        return f'{type(owner).__name__}.{code.co_name}'
+    return None
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import fastapi
+
+from sprintapi.cache import ResponseCache
+from sprintapi.error import NotFoundError
+
+
+def _request(path: str) -> fastapi.Request:
+    return fastapi.Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [],
+    })
+
+
+def _gather(cache: ResponseCache, handler, count: int) -> list[fastapi.Response]:
+    wrapped = cache.wrap(handler)
+
+    async def _run():
+        return await asyncio.gather(*(wrapped(_request('/items')) for _ in range(count)))
+
+    return asyncio.run(_run())
+
+
+def test_concurrent_misses_run_handler_once():
+    calls = 0
+
+    async def _handler(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return fastapi.Response(b'ok', status_code=200)
+
+    responses = _gather(ResponseCache(), _handler, 4)
+    assert [r.status_code for r in responses] == [200] * 4
+    assert calls == 1
+
+
+def test_concurrent_uncacheable_responses():
+    calls = 0
+
+    async def _handler(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return fastapi.Response(b'missing', status_code=404)
+
+    cache = ResponseCache()
+    begin = time.perf_counter()
+    responses = _gather(cache, _handler, 4)
+    assert [r.status_code for r in responses] == [404] * 4
+    assert calls == 4
+    assert not cache._inflight
+    # the leader, then all waiters at once
+    assert time.perf_counter() - begin < 0.15
+
+
+def test_concurrent_errors_run_waiters_at_once():
+    calls = 0
+
+    async def _handler(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        raise NotFoundError()
+
+    cache = ResponseCache()
+    wrapped = cache.wrap(_handler)
+
+    async def _run():
+        return await asyncio.gather(*(wrapped(_request('/items')) for _ in range(10)), return_exceptions=True)
+
+    begin = time.perf_counter()
+    results = asyncio.run(_run())
+    assert all(isinstance(r, NotFoundError) for r in results)
+    assert calls == 10
+    assert not cache._inflight
+    assert time.perf_counter() - begin < 0.2
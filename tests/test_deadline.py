@@ -0,0 +1,59 @@
+import asyncio
+
+from sprintapi import Controller, SprintApiServer, api_route, component, get_mapping
+from sprintapi.utility.asgi_client import AsgiClient
+
+
+_sessions = []
+
+
+@component(scope='request')
+class _DeadlineSession:
+    def __init__(self):
+        self.closed = False
+        _sessions.append(self)
+
+    def close(self):
+        self.closed = True
+
+
+@api_route('/deadline')
+class _DeadlineController(Controller):
+    @get_mapping('/timeout', timeout=5)
+    async def with_timeout(self, session: _DeadlineSession):
+        return {'closed': session.closed}
+
+    @get_mapping('/header')
+    async def with_header(self, session: _DeadlineSession):
+        return {'closed': session.closed}
+
+    @get_mapping('/slow', timeout=0.05)
+    async def slow(self, session: _DeadlineSession):
+        await asyncio.sleep(1)
+
+
+def _get(path: str, headers=()):
+    client = AsgiClient(SprintApiServer().app)
+    return asyncio.run(client.get(path, headers=headers))
+
+
+def test_request_scope_is_released_on_route_with_timeout():
+    _sessions.clear()
+    response = _get('/deadline/timeout')
+    assert response.status == 200
+    assert response.body == b'{"closed":false}'
+    assert [s.closed for s in _sessions] == [True]
+
+
+def test_request_scope_is_released_with_grpc_timeout_header():
+    _sessions.clear()
+    response = _get('/deadline/header', headers=[('grpc-timeout', '5S')])
+    assert response.status == 200
+    assert [s.closed for s in _sessions] == [True]
+
+
+def test_deadline_exceeded_releases_request_scope():
+    _sessions.clear()
+    response = _get('/deadline/slow')
+    assert response.status == 504
+    assert [s.closed for s in _sessions] == [True]
@@ -0,0 +1,28 @@
+import pytest
+
+from sprintapi.utility.di import DependencyContainer
+
+
+class _Session:
+    pass
+
+
+class _Repository:
+    def __init__(self, session: _Session):
+        self.session = session
+
+
+class _Service:
+    def __init__(self, repository: _Repository):
+        self.repository = repository
+
+
+@pytest.mark.parametrize('scope, pool_size', [('singleton', 0), ('request', 4)])
+def test_long_lived_component_cannot_depend_on_request_scope_indirectly(scope, pool_size):
+    container = DependencyContainer()
+    container.register(_Session, _Session, scope='request')
+    container.register(_Repository, _Repository, scope='transient')
+    container.register(_Service, _Service, scope=scope, pool_size=pool_size)
+
+    with pytest.raises(TypeError, match='cannot depend on request-scoped type "_Session"'):
+        container.compile()
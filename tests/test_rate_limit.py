@@ -0,0 +1,36 @@
+import asyncio
+
+from sprintapi import Controller, SprintApiServer, api_route, get_mapping
+from sprintapi.ratelimit import RateLimit
+from sprintapi.utility.asgi_client import AsgiClient
+
+
+@api_route('/rate-limited')
+class _RateLimitedController(Controller):
+    @get_mapping('', rate_limit=RateLimit(rate=1, key=lambda scope: 'all'))
+    async def get(self):
+        return {}
+
+
+def _get_twice(server: SprintApiServer, path: str):
+    client = AsgiClient(server.app)
+
+    async def _run():
+        return [await client.get(path) for _ in range(2)]
+
+    return asyncio.run(_run())
+
+
+def test_middleware_rejects_with_429():
+    server = SprintApiServer(rate_limit=RateLimit(rate=1, key=lambda scope: 'all'))
+    first, second = _get_twice(server, '/missing')
+    assert first.status == 404
+    assert second.status == 429
+    assert second.get_header('retry-after') == '1'
+
+
+def test_route_wrapper_rejects_with_429():
+    first, second = _get_twice(SprintApiServer(), '/rate-limited')
+    assert first.status == 200
+    assert second.status == 429
+    assert second.get_header('retry-after') == '1'